@@ -1,14 +1,28 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import perf
+from data_cache import read_table
+from filter_index import FilterIndex
+from paged_table import FrameSource, render_paged_table
+
+FILTER_COLUMNS = ['Country', 'recruit_translation', 'DayName']
+# Acima de WEBGL_THRESHOLD pontos o gráfico usa scattergl; acima de DENSITY_THRESHOLD
+# os pontos são agregados em uma grade no servidor e só as contagens vão ao navegador.
+WEBGL_THRESHOLD = 10_000
+DENSITY_THRESHOLD = 200_000
+DENSITY_BINS = 120
 
 # 1. Configuração e Carregamento de Dados (Cache)
-# Esta função lerá o arquivo CSV APENAS uma vez para performance
-@st.cache_data
+# Esta função lerá o arquivo CSV APENAS uma vez para performance.
+# cache_resource devolve o mesmo DataFrame a cada rerun, sem a cópia que o cache_data faz.
+@st.cache_resource
 def load_data():
     # Altere 'regression_data.csv' para o nome do seu arquivo, se for diferente
     try:
-        df = pd.read_csv('regression_data.csv')
+        df = read_table('regression_data.csv')
     except FileNotFoundError:
         st.error("Erro: O arquivo 'regression_data.csv' não foi encontrado. Certifique-se de que ele está no mesmo diretório do app.py.")
         st.stop()
@@ -18,10 +32,38 @@ def load_data():
     day_order = ['Segunda', 'Terca', 'Quarta', 'Quinta', 'Sexta', 'Sabado', 'Domingo']
     if 'DayName' in df.columns:
         df['DayName'] = pd.Categorical(df['DayName'], categories=day_order, ordered=True)
+    # Colunas de filtro como categorias: comparações e agrupamentos operam sobre códigos inteiros.
+    for col in ['Country', 'recruit_translation']:
+        df[col] = df[col].astype('category')
     
-    return df
+    return df, FilterIndex(df, FILTER_COLUMNS)
+
+
+def density_figure(dff, bins=DENSITY_BINS):
+    """Mapa de calor com as contagens de pontos por célula da grade, calculado no servidor."""
+    x, y = dff['Panelists_Coef'].to_numpy(), dff['N_Day'].to_numpy()
+    valid = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts.T > 0, counts.T, np.nan),
+        colorscale='Viridis',
+        colorbar={'title': 'Pontos'},
+        hovertemplate='Coef: %{x:.3f}<br>N_Day: %{y:.1f}<br>Pontos: %{z:,}<extra></extra>',
+    ))
+    fig.update_layout(
+        title=f"Dados Selecionados (N={len(dff)}, densidade em grade {bins}x{bins})",
+        xaxis_title='Coeficiente de Panelists (Impacto no Spend)',
+        yaxis_title='Nº de Observações (N_Day)',
+    )
+    return fig
+
+perf_recorder = perf.Recorder(perf.is_enabled(st), script='app.py')
 
-df = load_data()
+with perf_recorder.span('load_data') as span:
+    df, filter_index = load_data()
+    span.rows_out = len(df)
 
 # 2. Título da Aplicação
 st.title("Análise de Regressão por Grupo (Streamlit)")
@@ -29,8 +71,8 @@ st.subheader("Filtros Cumulativos para Análise Exploratória")
 
 # 3. Criação dos Filtros (Widgets Streamlit)
 ALL = 'Todos'
-country_options = [ALL] + df['Country'].unique().tolist()
-recruit_options = [ALL] + df['recruit_translation'].unique().tolist()
+country_options = [ALL] + filter_index.options('Country')
+recruit_options = [ALL] + filter_index.options('recruit_translation')
 # Adaptação para garantir a ordem correta dos dias no filtro
 day_options = [ALL] + df['DayName'].cat.categories.tolist()
 
@@ -47,33 +89,47 @@ with col3:
 
 
 # 4. Lógica de Filtragem Cumulativa
-dff = df.copy()
-
-if selected_country != ALL:
-    dff = dff[dff['Country'] == selected_country]
-if selected_recruit != ALL:
-    dff = dff[dff['recruit_translation'] == selected_recruit]
-if selected_day != ALL:
-    dff = dff[dff['DayName'] == selected_day]
+# Cada filtro vira uma máscara a partir do índice; só as linhas selecionadas são copiadas.
+with perf_recorder.span('filters', rows_in=len(df)) as span:
+    mask = filter_index.all_rows()
+    for col, selected in zip(FILTER_COLUMNS, [selected_country, selected_recruit, selected_day]):
+        if selected != ALL:
+            mask &= filter_index.select(col, [selected])
+    dff = df if mask.all() else df[mask]
+    span.rows_out = len(dff)
 
 # 5. Geração e Exibição do Gráfico (Plotly)
-fig = px.scatter(
-    dff,
-    x='Panelists_Coef',
-    y='N_Day',
-    color='Country',
-    symbol='DayName',
-    hover_data=['recruit_translation'],
-    title=f"Dados Selecionados (N={len(dff)})",
-    labels={
-        'Panelists_Coef': 'Coeficiente de Panelists (Impacto no Spend)',
-        'N_Day': 'Nº de Observações (N_Day)'
-    }
-)
-
-st.plotly_chart(fig, use_container_width=True)
-
-# Opcional: Mostrar o DataFrame filtrado
+# Até WEBGL_THRESHOLD pontos: SVG; até DENSITY_THRESHOLD: WebGL; acima: densidade agregada.
+with perf_recorder.span('figure', rows_in=len(dff)):
+    if len(dff) > DENSITY_THRESHOLD:
+        fig = density_figure(dff)
+    else:
+        fig = px.scatter(
+            dff,
+            x='Panelists_Coef',
+            y='N_Day',
+            color='Country',
+            symbol='DayName',
+            hover_data=['recruit_translation'],
+            title=f"Dados Selecionados (N={len(dff)})",
+            labels={
+                'Panelists_Coef': 'Coeficiente de Panelists (Impacto no Spend)',
+                'N_Day': 'Nº de Observações (N_Day)'
+            },
+            render_mode='webgl' if len(dff) > WEBGL_THRESHOLD else 'svg',
+        )
+
+with perf_recorder.span('plotly_chart', rows_in=len(dff)):
+    st.plotly_chart(fig, use_container_width=True)
+if len(dff) > DENSITY_THRESHOLD:
+    st.caption(f"Mais de {DENSITY_THRESHOLD:,} pontos: exibindo a densidade agregada. "
+               "Refine os filtros para ver os pontos individuais.")
+
+# Opcional: Mostrar o DataFrame filtrado (paginado; só a página visível vai ao navegador)
 st.markdown("---")
 st.caption("Tabela de Dados Filtrada:")
-st.dataframe(dff[['Country', 'recruit_translation', 'DayName', 'Panelists_Coef', 'N_Day']])
+with perf_recorder.span('dataframe', rows_in=len(dff)):
+    render_paged_table(st, 'regression', FrameSource(df, mask),
+                       columns=['Country', 'recruit_translation', 'DayName', 'Panelists_Coef', 'N_Day'])
+
+perf.render_panel(st, perf_recorder)
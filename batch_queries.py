@@ -0,0 +1,190 @@
+"""Consultas em lote sobre o plano: muitos filtros/agregados numa só passada.
+
+Entrada em JSON lines, uma consulta por linha:
+
+    {"id": "q1", "start": "2025-10-01", "end": "2025-10-07",
+     "filters": {"country": ["AR"], "Recruitment": ["Yes"]},
+     "breakdowns": ["age_group", "Gender"], "measure": "daily_recruitment_goal"}
+
+Sem `start`/`end` vale o plano inteiro (filtro de período desligado no
+dashboard). A saída tem uma linha JSON por consulta, na ordem da entrada, com
+os mesmos KPIs do dashboard em `totals` e cada quebra em ordem decrescente;
+uma consulta inválida (inclusive com valor de filtro que não existe na coluna)
+vira {"id": ..., "error": ...} sem interromper o lote. Os valores dos filtros
+são comparados pelo texto com os da coluna, então 3, 3.0 e "3" selecionam a
+mesma faixa numérica.
+
+As consultas são agrupadas por período: as somas por célula de cada período
+distinto (DemandCube.cell_sums) saem de uma única passada sobre os trechos, as
+máscaras de cada seleção de filtro ficam num cache comum a todo o lote, e
+totais/quebras de consultas com o mesmo período e filtros são calculados uma
+vez. Cada consulta só soma e agrupa sobre as células do cubo.
+
+    python batch_queries.py queries.jsonl --output results.jsonl
+    python batch_queries.py queries.jsonl --partitioned .data_cache/plan_dataset --country AR
+
+Com --partitioned o plano vem do dataset país/semana (pipeline.py
+--partitioned) e só as partições dos países de --country são lidas; as
+consultas valem para esse recorte.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from data_cache import read_table
+from demand_cube import MEASURES
+from filter_index import FilterIndex
+from partitioned_plan import PartitionCube, read_partitions
+import pipeline
+
+
+def _parse_date(value):
+    return None if value in (None, '') else pd.Timestamp(value).date()
+
+
+def _number(value):
+    value = value.item() if isinstance(value, np.generic) else value
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def _label(value):
+    # 3, 3.0 e '3' viram o mesmo rótulo; os valores do índice são comparados pelo mesmo texto.
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _resolve(index, col, values, labels):
+    # Valores da consulta -> valores reais da coluna no índice (que mantém o dtype nativo, ex.: int8).
+    if col not in labels:
+        labels[col] = {_label(value): value for value in index.options(col)}
+    missing = [value for value in values if _label(value) not in labels[col]]
+    if missing:
+        raise ValueError(f"valor inexistente em {col}: {', '.join(map(str, missing))}")
+    return tuple(sorted({labels[col][_label(value)] for value in values}, key=_label))
+
+
+def parse_query(query, cube, index, labels=None):
+    """Normaliza uma consulta em (período, filtros, quebras, medida); ValueError se for inválida."""
+    labels = {} if labels is None else labels
+    if not isinstance(query, dict):
+        raise ValueError("a consulta deve ser um objeto JSON")
+    start, end = _parse_date(query.get('start')), _parse_date(query.get('end'))
+    if start is not None and end is not None and start > end:
+        raise ValueError("start posterior a end")
+    filters = query.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters deve ser um objeto coluna -> valores")
+    selections = []
+    for col, values in filters.items():
+        if col not in index:
+            raise ValueError(f"coluna de filtro desconhecida: {col}")
+        values = [values] if isinstance(values, (str, int, float)) else values
+        if not isinstance(values, list) or any(isinstance(value, (list, dict)) for value in values):
+            raise ValueError(f"valores de {col} devem ser uma lista de valores")
+        if values:
+            selections.append((col, _resolve(index, col, values, labels)))
+    breakdowns = query.get('breakdowns') or []
+    if not isinstance(breakdowns, list):
+        raise ValueError("breakdowns deve ser uma lista de colunas")
+    unknown = [col for col in breakdowns if col not in cube.dimensions]
+    if unknown:
+        raise ValueError(f"quebra desconhecida: {', '.join(map(str, unknown))}")
+    measure = query.get('measure', 'daily_recruitment_goal')
+    if measure not in MEASURES:
+        raise ValueError(f"medida desconhecida: {measure}")
+    return {'period': (start, end), 'filters': tuple(sorted(selections, key=lambda selection: selection[0])),
+            'breakdowns': list(breakdowns), 'measure': measure}
+
+
+def run_batch(queries, cube, index):
+    """Resultados de `queries` (dicts ou linhas JSON), na mesma ordem, compartilhando o trabalho entre elas."""
+    results = [None] * len(queries)
+    by_period, labels = defaultdict(list), {}
+    for position, query in enumerate(queries):
+        query_id = position
+        try:
+            query = json.loads(query) if isinstance(query, str) else query
+            query_id = query.get('id', position) if isinstance(query, dict) else position
+            spec = parse_query(query, cube, index, labels)
+        except (TypeError, ValueError) as exc:
+            results[position] = {'id': query_id, 'error': str(exc)}
+            continue
+        by_period[spec['period']].append((position, query_id, spec))
+
+    selections = {}
+    for (start, end), group in by_period.items():
+        sums = cube.cell_sums(start, end)
+        masks, totals, breakdowns = {}, {}, {}
+        for position, query_id, spec in group:
+            key = spec['filters']
+            if key not in masks:
+                mask = sums['active'].copy()
+                for selection in key:
+                    if selection not in selections:
+                        selections[selection] = index.select(*selection)
+                    mask &= selections[selection]
+                masks[key] = mask
+                totals[key] = {col: _number(value) for col, value in cube.totals(cell_mask=mask, sums=sums).items()}
+            answer = {'id': query_id, 'totals': totals[key], 'breakdowns': {}}
+            for col in spec['breakdowns']:
+                group_key = (key, col, spec['measure'])
+                if group_key not in breakdowns:
+                    values, grouped = cube.grouped_sums(col, cell_mask=masks[key], measure=spec['measure'], sums=sums)
+                    breakdowns[group_key] = dict(zip(map(str, values), map(_number, grouped.tolist())))
+                answer['breakdowns'][col] = breakdowns[group_key]
+            results[position] = answer
+    return results
+
+
+def read_queries(path):
+    """Linhas não vazias de um arquivo JSON lines ('-' = entrada padrão); run_batch() as decodifica."""
+    if path == '-':
+        return [line for line in sys.stdin if line.strip()]
+    with open(path) as f:
+        return [line for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Responde um lote de consultas de filtro/agregado sobre o plano.")
+    parser.add_argument('queries_path', help="arquivo JSON lines com as consultas ('-' para a entrada padrão)")
+    parser.add_argument('--alloc', default='GeminiCheck.csv')
+    parser.add_argument('--output', default='-', help="arquivo JSON lines de saída (padrão: saída padrão)")
+    parser.add_argument('--partitioned', metavar='DIR', help="lê o plano do dataset particionado em DIR")
+    parser.add_argument('--country', action='append',
+                        help="com --partitioned, lê só as partições deste país (pode repetir)")
+    args = parser.parse_args(argv)
+    if args.country and not args.partitioned:
+        parser.error("--country exige --partitioned")
+
+    if args.partitioned:
+        df_plan = read_partitions(args.partitioned, args.country)
+        if df_plan.empty:
+            parser.error("nenhuma linha do plano nas partições pedidas")
+        cube = PartitionCube(df_plan)
+    else:
+        cube = pipeline.load_cube(pipeline.load_plan(read_table(args.alloc), compact=True))
+    index = FilterIndex(cube.cells, cube.dimensions)
+    queries = read_queries(args.queries_path)
+    started = time.perf_counter()
+    results = run_batch(queries, cube, index)
+    seconds = time.perf_counter() - started
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    rate = f"{len(results) / seconds:,.0f} consultas/s" if seconds > 0 else ""
+    print(f"{len(results):,} consultas em {seconds:.3f}s {rate}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""Benchmarks do pipeline de dados do dashboard, executados fora do Streamlit.
+
+    python -m benchmarks.run --quotas 10000 --output resultado.json
+    python -m benchmarks.run --quotas 10000 --compare resultado.json
+"""
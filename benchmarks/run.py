@@ -0,0 +1,156 @@
+"""Executa cada etapa do pipeline sobre entradas sintéticas e mede tempo, pico de RSS e linhas/s."""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic import add_scale_arguments, scale_options, write_inputs
+from data_cache import read_table
+from demand_cube import DemandCube
+from filter_index import FilterIndex
+from lazy_plan import IntervalPlan
+from plan_engine import build_plan
+
+FILTER_COLUMNS = ['project_id', 'country', 'Recruitment', 'Region', 'age_group', 'Gender', 'SEL']
+CHART_COLUMNS = ['age_group', 'Gender', 'country', 'SEL']
+OPTIONAL_STAGES = {'read_csv', 'read_excel', 'build_plan', 'materialize'}
+
+
+def _reset_peak_rss():
+    # No Linux, escrever 5 em clear_refs zera o VmHWM e permite medir o pico por etapa.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(results, name, func, rows_in):
+    """Executa `func` (que devolve (resultado, linhas de saída)) e registra as métricas em `results`."""
+    _reset_peak_rss()
+    start = time.perf_counter()
+    value, rows_out = func()
+    seconds = time.perf_counter() - start
+    # Leituras não têm linhas de entrada; para elas a vazão é medida nas linhas lidas.
+    rows = rows_in or rows_out
+    results[name] = {
+        'seconds': round(seconds, 6),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'rows_in': int(rows_in),
+        'rows_out': int(rows_out),
+        'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None,
+    }
+    print(f"{name:<20} {seconds:9.3f}s {results[name]['peak_rss_mb']:9.1f} MB {rows_in:>12,} -> {rows_out:,}",
+          file=sys.stderr)
+    return value
+
+
+def _filter_cascade(plan, cube, index):
+    start, end = plan.today, plan.today + timedelta(days=6)
+    mask = cube.active_mask(start, end)
+    for col in FILTER_COLUMNS:
+        if col in index:
+            options = index.options(col, mask)
+            if options and col != 'project_id':
+                mask &= index.select(col, options[:1])
+    return mask, int(mask.sum())
+
+
+def _aggregate(plan, cube, mask):
+    start, end = plan.today, plan.today + timedelta(days=6)
+    totals = cube.totals(start, end, mask)
+    charts = [cube.breakdown(col, start, end, mask) for col in CHART_COLUMNS if col in cube.dimensions]
+    return (totals, charts), sum(len(chart) for chart in charts)
+
+
+def run_benchmarks(paths, optional_stages=OPTIONAL_STAGES):
+    results = {}
+    if 'read_csv' in optional_stages:
+        measure(results, 'read_csv', lambda: (None, len(pd.read_csv(paths['GeminiCheck.csv']))), 0)
+    if 'read_excel' in optional_stages:
+        measure(results, 'read_excel', lambda: (None, len(pd.read_excel(paths['Report.xlsx']))), 0)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def load():
+            tables = [read_table(path, cache_dir) for path in paths.values()]
+            return tables, sum(len(df) for df in tables)
+        measure(results, 'load_data_cold', load, 0)
+        tables = measure(results, 'load_data_warm', load, 0)
+    df_alloc = tables[0]
+
+    if 'build_plan' in optional_stages:
+        measure(results, 'build_plan', lambda: (None, len(build_plan(df_alloc))), len(df_alloc))
+    plan = measure(results, 'interval_plan', lambda: ((p := IntervalPlan(df_alloc)), len(p.quotas)), len(df_alloc))
+    cube = measure(results, 'demand_cube', lambda: ((c := DemandCube(plan)), len(c)), len(plan.quotas))
+    index = measure(results, 'filter_index', lambda: (FilterIndex(cube.cells, FILTER_COLUMNS), len(cube.cells)),
+                    len(cube.cells))
+    mask = measure(results, 'filter_cascade', lambda: _filter_cascade(plan, cube, index), len(cube.cells))
+    measure(results, 'aggregate', lambda: _aggregate(plan, cube, mask), len(cube))
+    if 'materialize' in optional_stages:
+        quota_mask = plan.active_mask() & cube.quota_mask(mask)
+        measure(results, 'materialize', lambda: (None, len(plan.materialize(quota_index=plan.quotas.index[quota_mask]))),
+                int(quota_mask.sum()))
+    return results
+
+
+def compare(current, baseline):
+    """Razão tempo atual / tempo de referência por etapa (< 1 significa mais rápido)."""
+    ratios = {}
+    for name, stage in current['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if before and before['seconds']:
+            ratios[name] = round(stage['seconds'] / before['seconds'], 3)
+    return ratios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do dashboard sem o Streamlit.")
+    add_scale_arguments(parser)
+    parser.add_argument('--data-dir', help="usa/gera as entradas neste diretório em vez de um temporário")
+    parser.add_argument('--skip', nargs='*', default=[], choices=sorted(OPTIONAL_STAGES),
+                        help="etapas opcionais a pular (ex.: build_plan em escalas de milhões de cotas)")
+    parser.add_argument('--output', help="grava o resultado em JSON neste arquivo")
+    parser.add_argument('--compare', help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        paths = {name: os.path.join(data_dir, name) for name in ['GeminiCheck.csv', 'Projects.csv', 'Report.xlsx']}
+        if not all(os.path.exists(path) for path in paths.values()):
+            paths = write_inputs(data_dir, args.quotas, args.report_rows, args.seed, **scale_options(args))
+        report = {
+            'scale': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'stages': run_benchmarks(paths, OPTIONAL_STAGES - set(args.skip)),
+        }
+    if args.compare:
+        with open(args.compare) as f:
+            report['ratio_vs_baseline'] = compare(report, json.load(f))
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Gerador de entradas sintéticas (GeminiCheck.csv, Projects.csv, Report.xlsx) em escala configurável."""
+import argparse
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES = ['AR', 'BR', 'CL', 'CO', 'MX', 'PE', 'US', 'ES', 'PT', 'IT', 'FR', 'DE', 'UK', 'JP', 'IN']
+GENDERS = ['Female', 'Male']
+# Faixas de DaystoDeliver e seus pesos; NaN e valores < 1 viram 1 dia no plano.
+DEFAULT_DAYS = {'choices': [np.nan, 0.5, 7, 14, 30, 45, 60, 90], 'weights': [2, 1, 10, 15, 30, 20, 12, 10]}
+EXCEL_MAX_ROWS = 1_000_000
+
+
+def _labels(prefix, n):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def quota_dimensions(n_age_groups=6, n_regions=5, n_sel=4):
+    """Valores possíveis de cada dimensão de cota; 0 representa 'qualquer região/SEL'."""
+    return {
+        'age_group': [f"{18 + 5 * i}to{22 + 5 * i}" for i in range(n_age_groups)],
+        'Gender': GENDERS,
+        'Region': _labels('Region', n_regions) + [0],
+        'SEL': _labels('SEL', n_sel) + [0],
+    }
+
+
+def generate_alloc(n_quotas, n_projects=None, n_countries=5, days=None, dimensions=None, seed=0):
+    rng = np.random.default_rng(seed)
+    days = DEFAULT_DAYS if days is None else days
+    dimensions = quota_dimensions() if dimensions is None else dimensions
+    n_projects = max(1, n_quotas // 20) if n_projects is None else n_projects
+    weights = np.asarray(days['weights'], dtype=float)
+
+    dim_names = list(dimensions)
+    uses_dim = rng.random((n_quotas, len(dim_names))) < 0.6
+    uses_dim[~uses_dim.any(axis=1), 0] = True
+    value_idx = {name: rng.integers(len(values), size=n_quotas) for name, values in dimensions.items()}
+    cotas, resultado = [], []
+    for i in range(n_quotas):
+        names = [name for j, name in enumerate(dim_names) if uses_dim[i, j]]
+        cotas.append(repr(names))
+        resultado.append(repr([dimensions[name][value_idx[name][i]] for name in names]))
+
+    projects = rng.integers(100000, 100000 + n_projects, size=n_quotas)
+    return pd.DataFrame({
+        'project_id': projects,
+        'country': np.asarray(COUNTRIES[:n_countries])[projects % n_countries],
+        'Recruitment': rng.choice(['Yes', 'No'], size=n_quotas, p=[0.7, 0.3]),
+        'cotas': cotas,
+        'resultado_cota': resultado,
+        'Pessoas_Para_Recrutar': rng.integers(0, 400, size=n_quotas),
+        'allocated_completes': rng.integers(0, 60, size=n_quotas),
+        'DaystoDeliver': rng.choice(days['choices'], size=n_quotas, p=weights / weights.sum()),
+    })
+
+
+def generate_projects(df_alloc, seed=0):
+    rng = np.random.default_rng(seed)
+    projects = df_alloc.drop_duplicates('project_id')[['project_id', 'country']].reset_index(drop=True)
+    n = len(projects)
+    return projects.assign(
+        age_group=0, Gender=rng.choice(GENDERS, size=n), Region=0, SEL=0,
+        expectedcompletes=rng.integers(100, 5000, size=n).astype(float),
+    )
+
+
+def generate_report(n_rows, n_countries=5, dimensions=None, seed=0):
+    rng = np.random.default_rng(seed)
+    dimensions = quota_dimensions() if dimensions is None else dimensions
+    regions = [region for region in dimensions['Region'] if region != 0]
+    start = date.today()
+    return pd.DataFrame({
+        'country': rng.choice(COUNTRIES[:n_countries], size=n_rows),
+        'Expected Date': pd.to_datetime([start + timedelta(days=int(d)) for d in rng.integers(0, 90, size=n_rows)]),
+        'Age': rng.choice(dimensions['age_group'], size=n_rows),
+        'Gender': rng.choice(GENDERS, size=n_rows),
+        'Region': rng.choice(regions, size=n_rows),
+        'people_to_recruit': rng.integers(1, 100, size=n_rows),
+        'allocated_completes': rng.integers(1, 20, size=n_rows),
+    })
+
+
+def write_inputs(directory, n_quotas, report_rows=None, seed=0, **alloc_options):
+    """Grava os três arquivos de entrada em `directory` e devolve seus caminhos."""
+    os.makedirs(directory, exist_ok=True)
+    df_alloc = generate_alloc(n_quotas, seed=seed, **alloc_options)
+    report_rows = min(n_quotas, EXCEL_MAX_ROWS) if report_rows is None else min(report_rows, EXCEL_MAX_ROWS)
+    paths = {name: os.path.join(directory, name) for name in ['GeminiCheck.csv', 'Projects.csv', 'Report.xlsx']}
+    df_alloc.to_csv(paths['GeminiCheck.csv'])
+    generate_projects(df_alloc, seed).to_csv(paths['Projects.csv'], index=False)
+    n_countries = alloc_options.get('n_countries', 5)
+    generate_report(report_rows, n_countries, alloc_options.get('dimensions'), seed).to_excel(paths['Report.xlsx'])
+    return paths
+
+
+def parse_days(text):
+    """'7:10,30:30,90:5' -> distribuição de DaystoDeliver (dias:peso)."""
+    pairs = [item.split(':') for item in text.split(',')]
+    return {'choices': [float(d) for d, _ in pairs], 'weights': [float(w) for _, w in pairs]}
+
+
+def add_scale_arguments(parser):
+    parser.add_argument('--quotas', type=int, default=1000)
+    parser.add_argument('--report-rows', type=int)
+    parser.add_argument('--projects', type=int)
+    parser.add_argument('--countries', type=int, default=5)
+    parser.add_argument('--age-groups', type=int, default=6)
+    parser.add_argument('--regions', type=int, default=5)
+    parser.add_argument('--sel', type=int, default=4)
+    parser.add_argument('--days', type=parse_days, help="distribuição de DaystoDeliver, ex.: 7:10,30:30,90:5")
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def scale_options(args):
+    return {
+        'n_projects': args.projects,
+        'n_countries': args.countries,
+        'days': args.days,
+        'dimensions': quota_dimensions(args.age_groups, args.regions, args.sel),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera entradas sintéticas para o dashboard.")
+    parser.add_argument('directory')
+    add_scale_arguments(parser)
+    args = parser.parse_args(argv)
+    paths = write_inputs(args.directory, args.quotas, args.report_rows, args.seed, **scale_options(args))
+    for path in paths.values():
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
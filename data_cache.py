@@ -0,0 +1,160 @@
+"""Cache colunar em disco para os arquivos de entrada do dashboard.
+
+Cada arquivo (CSV ou Excel) é convertido uma única vez para Arrow IPC em
+CACHE_DIR; nas leituras seguintes o arquivo colunar é aberto via memory-map.
+A entrada é invalidada por caminho, tamanho, mtime e hash do conteúdo: se só
+o mtime mudou e o conteúdo é o mesmo, o cache é reaproveitado. Arquivos com
+colunas de tipos mistos não têm representação Arrow e ficam fora do cache
+(avisado no log e no resumo do pré-aquecimento).
+
+Para pré-aquecer o cache no deploy:
+
+    python data_cache.py GeminiCheck.csv Projects.csv Report.xlsx
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = '.data_cache'
+READERS = {'.csv': pd.read_csv, '.xlsx': pd.read_excel, '.xls': pd.read_excel}
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(path, cache_dir):
+    source = os.path.abspath(path)
+    key = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+    base = os.path.join(cache_dir, f"{os.path.basename(source)}-{key}")
+    return base + '.arrow', base + '.json'
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path, write):
+    """Chama write(tmp_path) e troca o arquivo de uma vez: leitores nunca veem `path` pela metade."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, value, indent=None):
+    """Grava `value` como JSON em `path` via write_atomic()."""
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f, indent=indent)
+    write_atomic(path, write)
+
+
+def read_arrow(arrow_path, zero_copy=False):
+    """Lê um arquivo Arrow IPC via memory-map.
+
+    Com `zero_copy=True` as colunas numéricas sem nulos viram visões somente
+    leitura sobre o próprio mapeamento (nada é copiado para o heap e as páginas
+    são compartilhadas pelo cache do sistema); escrever nelas levanta ValueError.
+    """
+    with pa.memory_map(arrow_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True) if zero_copy else table.to_pandas()
+
+
+def write_arrow(df, arrow_path):
+    """Grava `df` em Arrow IPC de forma atômica; levanta ArrowInvalid/ArrowTypeError para colunas mistas."""
+    table = pa.Table.from_pandas(df)
+
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    write_atomic(arrow_path, write)
+
+
+def _read_source(path):
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Formato de arquivo não suportado: {path}")
+    return reader(path)
+
+
+def _convert(path, arrow_path, meta_path, signature, digest, zero_copy=False):
+    df = _read_source(path)
+    try:
+        write_arrow(df, arrow_path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+        # Colunas com tipos mistos não têm representação Arrow; a fonte é lida de novo a cada carga.
+        logger.warning("%s não foi para o cache colunar (%s); lendo direto da fonte", path, exc)
+        return df
+    write_json_atomic(meta_path, {**signature, 'hash': digest})
+    # Sempre o que sai do Arrow: a leitura a frio devolve o mesmo frame das leituras seguintes.
+    return read_arrow(arrow_path, zero_copy)
+
+
+def read_table(path, cache_dir=CACHE_DIR, zero_copy=False):
+    """Lê `path` pelo cache colunar, convertendo a fonte apenas quando ela mudou.
+
+    `zero_copy` é repassado a read_arrow(), inclusive logo após uma conversão.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    arrow_path, meta_path = _cache_paths(path, cache_dir)
+    signature = file_signature(path)
+    meta = _read_meta(meta_path)
+    cached = meta is not None and os.path.exists(arrow_path)
+    if cached and all(meta.get(k) == v for k, v in signature.items()):
+        return read_arrow(arrow_path, zero_copy)
+
+    digest = content_hash(path)
+    if cached and meta.get('hash') == digest:
+        write_json_atomic(meta_path, {**signature, 'hash': digest})
+        return read_arrow(arrow_path, zero_copy)
+    return _convert(path, arrow_path, meta_path, signature, digest, zero_copy)
+
+
+def is_cached(path, cache_dir=CACHE_DIR):
+    """True se o cache de `path` corresponde ao arquivo atual (mesmo tamanho e mtime)."""
+    arrow_path, meta_path = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+    return (meta is not None and os.path.exists(arrow_path)
+            and all(meta.get(k) == v for k, v in file_signature(path).items()))
+
+
+def warm_cache(paths, cache_dir=CACHE_DIR):
+    """Converte todos os `paths`; devolve o nº de linhas de cada um e se ele ficou no cache."""
+    return {path: {'rows': len(read_table(path, cache_dir)), 'cached': is_cached(path, cache_dir)}
+            for path in paths}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-aquece o cache colunar dos arquivos de entrada.")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+    logging.basicConfig(format='%(levelname)s: %(message)s')
+    for path, status in warm_cache(args.paths, args.cache_dir).items():
+        note = '' if status['cached'] else ' (fora do cache: colunas sem representação Arrow)'
+        print(f"{path}: {status['rows']} linhas{note}")
+
+
+if __name__ == '__main__':
+    main()
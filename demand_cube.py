@@ -0,0 +1,175 @@
+"""Cubo pré-agregado de demanda para os KPIs e gráficos do dashboard.
+
+As cotas são agrupadas em células (combinações de project_id, país,
+recrutamento, região, faixa etária, gênero e SEL). Para cada célula a meta
+diária é constante por trechos, então o eixo plan_date é guardado como
+trechos (dia inicial, dia final, valor por dia) em vez de uma linha por dia.
+Somas de qualquer período e filtro saem desses trechos, sem tocar no plano.
+"""
+import numpy as np
+import pandas as pd
+
+from plan_engine import quota_column
+
+CUBE_DIMENSIONS = ['project_id', 'country', 'Recruitment', 'Region', 'age_group', 'Gender', 'SEL']
+MEASURES = ['daily_recruitment_goal', 'daily_allocated_goal', 'plan_rows']
+
+
+def _split_events(totals, days, active_days):
+    # A divisão base + resto vale base + 1 nos ceil(resto) primeiros dias e base nos demais,
+    # mas só os `active_days` primeiros dias têm linha no plano (IntervalPlan.active_days).
+    base = np.nan_to_num(totals // days)
+    extra_days = np.minimum(np.nan_to_num(np.ceil(totals % days)).astype(np.int64), active_days)
+    zeros = np.zeros(len(days), dtype=np.int64)
+    event_days = np.concatenate([zeros, extra_days, active_days])
+    deltas = np.concatenate([base + (extra_days > 0), -(extra_days > 0).astype(base.dtype), -base])
+    return event_days, deltas
+
+
+class CellQueries:
+    """Totais e quebras a partir das somas por célula.
+
+    A classe que usa o mixin define `cells`, `dimensions`, `_codes` (dict vazio)
+    e cell_sums(start, end) com as somas de MEASURES, `allocated_completes` e a
+    máscara `active` por célula.
+    """
+
+    def totals(self, start=None, end=None, cell_mask=None, sums=None):
+        """Somas das metas do período e o total de completes das cotas ativas nele."""
+        sums = self.cell_sums(start, end) if sums is None else sums
+        cells = slice(None) if cell_mask is None else cell_mask
+        return {col: sums[col][cells].sum() for col in [*MEASURES, 'allocated_completes']}
+
+    def dimension_codes(self, col):
+        """Códigos (factorize ordenado) e valores de `col` por célula, calculados uma vez."""
+        if col not in self._codes:
+            codes, values = pd.factorize(self.cells[col], sort=True)
+            self._codes[col] = codes, np.asarray(values)
+        return self._codes[col]
+
+    def grouped_sums(self, col, start=None, end=None, cell_mask=None, measure='daily_recruitment_goal', sums=None):
+        """Valores de `col` presentes no período/filtro e a soma de `measure` de cada um, em ordem decrescente."""
+        sums = self.cell_sums(start, end) if sums is None else sums
+        codes, values = self.dimension_codes(col)
+        present = sums['active'] & (codes >= 0)
+        if cell_mask is not None:
+            present &= cell_mask
+        grouped = np.bincount(codes[present], weights=sums[measure][present], minlength=len(values))
+        if np.issubdtype(sums[measure].dtype, np.integer):
+            grouped = grouped.astype(np.int64)
+        in_view = np.flatnonzero(np.bincount(codes[present], minlength=len(values)))
+        # Mesma ordem de sort_values(ascending=False), inclusive nos empates (como o nargsort do pandas).
+        order = in_view[::-1][grouped[in_view][::-1].argsort(kind='quicksort')][::-1]
+        return values[order], grouped[order]
+
+    def breakdown(self, col, start=None, end=None, cell_mask=None, measure='daily_recruitment_goal', sums=None):
+        """Equivalente a groupby(col)[measure].sum() das linhas do plano, em ordem decrescente."""
+        values, grouped = self.grouped_sums(col, start, end, cell_mask, measure, sums)
+        return pd.Series(grouped, index=pd.Index(values, name=col), name=measure)
+
+
+class DemandCube(CellQueries):
+
+    def __init__(self, plan):
+        self.plan = plan
+        quotas = plan.quotas
+        self.dimensions = [col for col in CUBE_DIMENSIONS if col in quotas.columns]
+        if self.dimensions:
+            cells = quotas.groupby(self.dimensions, dropna=False, sort=False, observed=True)
+            self.quota_cell = cells.ngroup().to_numpy()
+        else:
+            self.quota_cell = np.zeros(len(quotas), dtype=np.int64)
+        n_cells = int(self.quota_cell.max()) + 1 if len(quotas) else 0
+        first = pd.Series(np.arange(len(quotas))).groupby(self.quota_cell).first().to_numpy()
+        self.cells = quotas[self.dimensions].iloc[first].reset_index(drop=True)
+
+        last_day = plan.active_days - 1
+        self.cell_last_day = np.full(n_cells, -1, dtype=np.int64)
+        np.maximum.at(self.cell_last_day, self.quota_cell, last_day)
+        completes = np.nan_to_num(quota_column(quotas, 'allocated_completes', 0).astype('float64'))
+        quota_completes = pd.DataFrame({'cell': self.quota_cell, 'last_day': last_day, 'allocated_completes': completes})
+        self.completes = quota_completes.groupby(['cell', 'last_day'], as_index=False).sum()
+        self.runs = self._build_runs(plan)
+        self._codes = {}
+
+    def _build_runs(self, plan):
+        streams = {col: _split_events(totals, plan.days, plan.active_days) for col, totals in plan.goals.items()}
+        streams['plan_rows'] = _split_events(plan.active_days, plan.active_days, plan.active_days)
+        parts = []
+        for col, (event_days, deltas) in streams.items():
+            part = pd.DataFrame({'cell': np.tile(self.quota_cell, 3), 'day': event_days})
+            for other in MEASURES:
+                part[other] = deltas if other == col else 0
+            parts.append(part)
+        events = pd.concat(parts, ignore_index=True).groupby(['cell', 'day'], as_index=False).sum()
+        values = events.groupby('cell')[MEASURES].cumsum()
+        next_day = events.groupby('cell')['day'].shift(-1)
+        runs = pd.DataFrame({'cell': events['cell'], 'start': events['day'], 'end': next_day - 1, **values})
+        runs = runs[runs['end'].notna() & (runs[MEASURES] != 0).any(axis=1)]
+        runs = runs.astype({'end': np.int64}).sort_values(['start', 'cell'], kind='stable')
+        return runs.reset_index(drop=True)
+
+    def to_tables(self):
+        """Tabelas colunares que reconstroem o cubo com from_tables()."""
+        return {
+            'cells': self.cells,
+            'runs': self.runs,
+            'completes': self.completes,
+            'quota_cell': pd.DataFrame({'cell': self.quota_cell}),
+            'cell_last_day': pd.DataFrame({'last_day': self.cell_last_day}),
+        }
+
+    @classmethod
+    def from_tables(cls, plan, tables):
+        cube = cls.__new__(cls)
+        cube.plan = plan
+        cube.cells = tables['cells']
+        cube.dimensions = list(cube.cells.columns)
+        cube.runs = tables['runs']
+        cube.completes = tables['completes']
+        cube.quota_cell = tables['quota_cell']['cell'].to_numpy()
+        cube.cell_last_day = tables['cell_last_day']['last_day'].to_numpy()
+        cube._codes = {}
+        return cube
+
+    def __len__(self):
+        return len(self.runs)
+
+    def active_mask(self, start=None, end=None):
+        """Células com ao menos uma cota com linhas entre `start` e `end`."""
+        lo, hi = self.plan.offsets(start, end)
+        return np.minimum(hi, self.cell_last_day) - max(lo, 0) + 1 > 0
+
+    def quota_mask(self, cell_mask):
+        return cell_mask[self.quota_cell]
+
+    def _overlap(self, start, end, cell_mask):
+        lo, hi = self.plan.offsets(start, end)
+        runs = self.runs
+        overlap = np.clip(np.minimum(runs['end'].to_numpy(), hi) - np.maximum(runs['start'].to_numpy(), lo) + 1, 0, None)
+        if cell_mask is not None:
+            overlap = overlap * cell_mask[runs['cell'].to_numpy()]
+        return overlap
+
+    def cell_sums(self, start=None, end=None):
+        """Somas por célula no período: metas, completes das cotas ativas e a máscara `active`.
+
+        É a única passada sobre os trechos; totals() e breakdown() aceitam o
+        resultado em `sums` para responder vários filtros do mesmo período.
+        """
+        n_cells = len(self.cells)
+        run_cells = self.runs['cell'].to_numpy()
+        overlap = self._overlap(start, end, None)
+        sums = {}
+        for col in MEASURES:
+            values = self.runs[col].to_numpy()
+            sums[col] = np.bincount(run_cells, weights=values * overlap, minlength=n_cells)
+            if np.issubdtype(values.dtype, np.integer):
+                sums[col] = sums[col].astype(np.int64)
+        lo, hi = self.plan.offsets(start, end)
+        completes = self.completes
+        active = (np.minimum(hi, completes['last_day'].to_numpy()) - max(lo, 0) + 1) > 0
+        sums['allocated_completes'] = np.bincount(completes['cell'].to_numpy()[active], minlength=n_cells,
+                                                  weights=completes['allocated_completes'].to_numpy()[active])
+        sums['active'] = self.active_mask(start, end)
+        return sums
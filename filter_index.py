@@ -0,0 +1,50 @@
+"""Índice invertido para a cascata de filtros da barra lateral.
+
+Para cada coluna filtrável guarda os códigos de cada linha e, por valor, a
+lista ordenada das linhas que o contêm. Uma combinação de filtros vira uma
+máscara booleana montada a partir dessas listas, e as opções restantes de
+cada widget saem de uma contagem sobre os códigos, sem copiar o DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int(n_values):
+    return np.int8 if n_values < 2 ** 7 else np.int16 if n_values < 2 ** 15 else np.int32
+
+
+class FilterIndex:
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self._values, self._codes, self._postings, self._bounds = {}, {}, {}, {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, values = pd.factorize(df[col], sort=True)
+            postings = np.argsort(codes, kind='stable').astype(np.int32)
+            self._values[col] = np.asarray(values)
+            self._codes[col] = codes.astype(_smallest_int(len(values)))
+            self._postings[col] = postings
+            self._bounds[col] = np.searchsorted(codes[postings], np.arange(len(values) + 1))
+
+    def __contains__(self, col):
+        return col in self._codes
+
+    def all_rows(self):
+        return np.ones(self.n_rows, dtype=bool)
+
+    def options(self, col, mask=None):
+        """Valores de `col` (ordenados, sem nulos) presentes nas linhas de `mask`."""
+        codes = self._codes[col] if mask is None else self._codes[col][mask]
+        present = np.bincount(codes.astype(np.int64) + 1, minlength=len(self._values[col]) + 1)[1:] > 0
+        return self._values[col][present].tolist()
+
+    def select(self, col, selected):
+        """Máscara das linhas cujo valor de `col` está em `selected`."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        bounds, postings = self._bounds[col], self._postings[col]
+        for code in pd.Index(self._values[col]).get_indexer(list(selected)):
+            if code >= 0:
+                mask[postings[bounds[code]:bounds[code + 1]]] = True
+        return mask
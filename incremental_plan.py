@@ -0,0 +1,238 @@
+"""Regeneração incremental do plano diário.
+
+Cada cota é identificada por uma chave estável (project_id + definição da cota)
+e por uma impressão digital do conteúdo da linha. A cada atualização do
+arquivo de alocação só as cotas novas ou alteradas são expandidas de novo; as
+removidas são descartadas e as demais linhas do plano anterior são reaproveitadas.
+
+O snapshot guarda o plano em PLAN_BLOCKS blocos (chave da cota % PLAN_BLOCKS),
+cada um com as linhas e a tabela das suas cotas. As linhas guardam a chave da
+cota em vez do índice na alocação, então inserir ou remover linhas do CSV não
+invalida os outros blocos: uma atualização só lê e regrava os blocos com cotas
+novas, alteradas ou removidas. plan_from_snapshot() junta os blocos na ordem do
+build_plan() e decodifica as dimensões das cotas sobre o plano inteiro (o tipo
+inferido de Region/SEL depende de todas as cotas), com as mesmas colunas.
+"""
+import glob
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_cache import CACHE_DIR, read_arrow, write_arrow, write_json_atomic
+from plan_engine import attach_quota_dims, build_plan, parse_quota_definitions, row_field_names
+
+QUOTA_KEY_COLUMNS = ['project_id', 'country', 'Recruitment', 'cotas', 'resultado_cota']
+PLAN_SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'plan_snapshot')
+PLAN_BLOCKS = 64
+DAY_COLUMNS = ['plan_date', 'daily_recruitment_goal', 'daily_allocated_goal']
+# Colunas que identificam a cota de cada linha dentro dos blocos gravados.
+ROW_KEYS = ['_quota_key', '_occurrence']
+QUOTA_TABLE_COLUMNS = ['quota_key', 'occurrence', 'fingerprint', 'block']
+
+
+def quota_table(df_alloc):
+    """Chave estável, ocorrência (para chaves repetidas), impressão digital e bloco de cada cota."""
+    key_cols = [col for col in QUOTA_KEY_COLUMNS if col in df_alloc.columns]
+    quota_key = pd.util.hash_pandas_object(df_alloc[key_cols], index=False).to_numpy()
+    occurrence = pd.Series(quota_key).groupby(quota_key).cumcount().to_numpy()
+    return pd.DataFrame({
+        'quota_key': quota_key,
+        'occurrence': occurrence,
+        'fingerprint': pd.util.hash_pandas_object(df_alloc, index=False).to_numpy(),
+        'block': (quota_key % PLAN_BLOCKS).astype(np.int64),
+        'alloc_index': df_alloc.index.to_numpy(),
+    })
+
+
+def _quota_keys(quotas):
+    return pd.MultiIndex.from_arrays([quotas['quota_key'], quotas['occurrence']])
+
+
+def _row_keys(rows):
+    return pd.MultiIndex.from_arrays([rows[col] for col in ROW_KEYS])
+
+
+def _split_blocks(df_plan, quotas, alloc_columns):
+    # Troca original_quota_index pela chave da cota e separa as linhas por bloco. As dimensões
+    # das cotas não são guardadas: o tipo inferido delas depende de todas as cotas do plano.
+    if df_plan.empty:
+        return {}
+    positions = pd.Index(quotas['alloc_index']).get_indexer(df_plan['original_quota_index'])
+    rows = df_plan[[*row_field_names(alloc_columns), *DAY_COLUMNS]].copy()
+    rows[ROW_KEYS[0]] = quotas['quota_key'].to_numpy()[positions]
+    rows[ROW_KEYS[1]] = quotas['occurrence'].to_numpy()[positions]
+    blocks = quotas['block'].to_numpy()[positions]
+    return {int(block): rows.take(rows_in_block).reset_index(drop=True)
+            for block, rows_in_block in pd.Series(blocks).groupby(blocks).indices.items()}
+
+
+def _block(snapshot, block):
+    # Blocos de um snapshot carregado só são lidos quando alguém precisa deles.
+    rows = snapshot['blocks'].get(block)
+    if isinstance(rows, str):
+        rows = snapshot['blocks'][block] = read_arrow(rows)
+    return rows
+
+
+def _snapshot(df_alloc, quotas, blocks, rows, today, dirty):
+    return {
+        'today': today.isoformat(),
+        'columns': [str(col) for col in df_alloc.columns],
+        'quotas': quotas,
+        'blocks': blocks,
+        'rows': rows,
+        'dirty': dirty,
+    }
+
+
+def _full_rebuild(df_alloc, quotas, today, previous, build):
+    df_plan = build(df_alloc, today)
+    stats = {
+        'reused': 0,
+        'rebuilt': len(df_plan),
+        'dropped': sum(previous['rows'].values()) if previous is not None else 0,
+    }
+    blocks = _split_blocks(df_plan, quotas, df_alloc.columns)
+    rows = {block: len(block_rows) for block, block_rows in blocks.items()}
+    return _snapshot(df_alloc, quotas, blocks, rows, today, None), stats
+
+
+def update_plan(df_alloc, previous=None, today=None, build=build_plan):
+    """Atualiza o snapshot `previous` para a alocação `df_alloc`.
+
+    Devolve o novo snapshot e as contagens de linhas do plano reaproveitadas,
+    recalculadas e descartadas. Mudança de dia ou de colunas força reconstrução total.
+    `build(df_alloc, today)` expande as cotas novas ou alteradas (padrão: build_plan).
+    """
+    if today is None:
+        today = date.today()
+    quotas = quota_table(df_alloc)
+    if (previous is None or previous['today'] != today.isoformat()
+            or previous['columns'] != [str(col) for col in df_alloc.columns]):
+        return _full_rebuild(df_alloc, quotas, today, previous, build)
+
+    old_quotas = previous['quotas']
+    old_pos = _quota_keys(old_quotas).get_indexer(_quota_keys(quotas))
+    matched = old_pos >= 0
+    unchanged = matched.copy()
+    unchanged[matched] = (old_quotas['fingerprint'].to_numpy()[old_pos[matched]]
+                          == quotas['fingerprint'].to_numpy()[matched])
+    kept = np.zeros(len(old_quotas), dtype=bool)
+    kept[old_pos[unchanged]] = True
+    touched = set(quotas['block'].to_numpy()[~unchanged].tolist())
+    touched |= set(old_quotas['block'].to_numpy()[~kept].tolist())
+
+    df_rebuilt = build(df_alloc[~unchanged], today)
+    rebuilt = _split_blocks(df_rebuilt, quotas, df_alloc.columns)
+    kept_keys = _quota_keys(old_quotas[kept])
+    blocks = {block: rows for block, rows in previous['blocks'].items() if block not in touched}
+    rows = {block: n_rows for block, n_rows in previous['rows'].items() if block not in touched}
+    n_dropped = 0
+    for block in touched:
+        parts = []
+        old_rows = _block(previous, block)
+        if old_rows is not None:
+            keep = _row_keys(old_rows).isin(kept_keys)
+            n_dropped += int((~keep).sum())
+            parts.append(old_rows[keep])
+        if block in rebuilt:
+            parts.append(rebuilt[block])
+        parts = [part for part in parts if not part.empty]
+        if parts:
+            blocks[block] = pd.concat(parts, ignore_index=True)
+            rows[block] = len(blocks[block])
+
+    stats = {'reused': sum(previous['rows'].values()) - n_dropped, 'rebuilt': len(df_rebuilt), 'dropped': n_dropped}
+    return _snapshot(df_alloc, quotas, blocks, rows, today, touched), stats
+
+
+def plan_from_snapshot(snapshot, df_alloc):
+    """Plano diário do snapshot, igual ao build_plan() da alocação `df_alloc` que o gerou."""
+    frames = [_block(snapshot, block) for block in sorted(snapshot['blocks'])]
+    if not frames:
+        return pd.DataFrame()
+    rows = pd.concat(frames, ignore_index=True)
+    quotas = snapshot['quotas']
+    positions = _quota_keys(quotas).get_indexer(_row_keys(rows))
+    order = np.argsort(positions, kind='stable')
+    rows = rows.take(order).reset_index(drop=True)
+    rows['original_quota_index'] = quotas['alloc_index'].to_numpy()[positions[order]]
+    rows = rows.drop(columns=ROW_KEYS)
+    # Dimensões decodificadas sobre todas as cotas do plano, como no build_plan().
+    quota_dims = parse_quota_definitions(df_alloc, pd.unique(rows['original_quota_index']))
+    df_plan = attach_quota_dims(rows, quota_dims)
+    df_plan['project_id'] = df_plan['project_id'].astype(str)
+    return df_plan
+
+
+def _block_paths(directory, block):
+    return (os.path.join(directory, f'plan-{block:03d}.arrow'),
+            os.path.join(directory, f'quotas-{block:03d}.arrow'))
+
+
+def save_snapshot(snapshot, directory=PLAN_SNAPSHOT_DIR):
+    """Persiste os blocos alterados; devolve False se o plano tiver colunas sem representação Arrow."""
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        # Sem meta.json o snapshot é ignorado, então uma gravação interrompida nunca é lida pela metade.
+        os.remove(meta_path)
+    quotas = snapshot['quotas']
+    quota_blocks = quotas.groupby('block').indices
+    dirty = snapshot['dirty']
+    if dirty is None:
+        # Reconstrução total: descarta todos os arquivos anteriores.
+        for path in glob.glob(os.path.join(directory, '*.arrow')):
+            os.remove(path)
+        dirty = quota_blocks.keys()
+    try:
+        for block in dirty:
+            plan_path, quotas_path = _block_paths(directory, block)
+            for path in (plan_path, quotas_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            if block in quota_blocks:
+                block_quotas = quotas.take(quota_blocks[block]).drop(columns='alloc_index')
+                write_arrow(block_quotas.reset_index(drop=True), quotas_path)
+            if block in snapshot['blocks']:
+                write_arrow(_block(snapshot, block), plan_path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+    write_json_atomic(meta_path, {
+        'today': snapshot['today'],
+        'columns': snapshot['columns'],
+        'quota_blocks': sorted(int(block) for block in quota_blocks),
+        'rows': {str(block): n_rows for block, n_rows in snapshot['rows'].items()},
+    })
+    return True
+
+
+def load_snapshot(directory=PLAN_SNAPSHOT_DIR):
+    """Snapshot salvo em `directory` com a tabela de cotas; as linhas de cada bloco são lidas sob demanda."""
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        quotas = [read_arrow(_block_paths(directory, block)[1]) for block in meta['quota_blocks']]
+        rows = {int(block): n_rows for block, n_rows in meta['rows'].items()}
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+        return None
+    return {
+        'today': meta['today'],
+        'columns': meta['columns'],
+        'quotas': pd.concat(quotas, ignore_index=True) if quotas else pd.DataFrame(columns=QUOTA_TABLE_COLUMNS),
+        'blocks': {block: _block_paths(directory, block)[0] for block in rows},
+        'rows': rows,
+        'dirty': set(),
+    }
+
+
+def refresh_plan(df_alloc, directory=PLAN_SNAPSHOT_DIR, today=None, build=build_plan):
+    """Atualiza o plano persistido em `directory` e devolve (plano, estatísticas)."""
+    snapshot, stats = update_plan(df_alloc, load_snapshot(directory), today, build)
+    stats['saved'] = save_snapshot(snapshot, directory)
+    stats['blocks_written'] = len(snapshot['blocks']) if snapshot['dirty'] is None else len(snapshot['dirty'])
+    return plan_from_snapshot(snapshot, df_alloc), stats
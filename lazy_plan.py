@@ -0,0 +1,140 @@
+"""Plano diário representado por intervalos, sem uma linha por dia.
+
+Cada cota vira um intervalo (hoje, dias de entrega, total) e as somas de
+qualquer período saem da divisão base + resto em forma fechada. As linhas
+diárias só são geradas quando a tabela detalhada precisa delas.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from plan_engine import (attach_quota_dims, compact_plan, delivery_days, expand_plan, parse_quota_definitions,
+                         quota_column, row_field_names)
+
+GOAL_COLUMNS = {'daily_recruitment_goal': 'Pessoas_Para_Recrutar', 'daily_allocated_goal': 'allocated_completes'}
+
+
+def _leading_days(totals, days):
+    # Dia i vale base + (i < resto), que não cresce com i: os dias com meta > 0 formam um
+    # prefixo. São todos se base > 0, os ceil(resto) primeiros se base == 0 e nenhum se a
+    # base for negativa ou o total ausente.
+    base, remainder = totals // days, totals % days
+    leading = np.where(base > 0, days, np.where(base == 0, np.ceil(remainder), 0))
+    return np.nan_to_num(leading).astype(np.int64)
+
+
+def split_sum(totals, days, lo, hi, active_days=None):
+    """Soma da divisão base + resto entre os dias `lo` e `hi` (inclusive) de cada cota.
+
+    Só entram os `active_days` primeiros dias (os que têm linha no plano; padrão: todos),
+    então metas negativas ou nulas nos dias descartados por build_plan() não são somadas.
+    """
+    base, remainder = totals // days, totals % days
+    last_day = days - 1 if active_days is None else np.minimum(days, active_days) - 1
+    lo, hi = np.maximum(lo, 0), np.minimum(hi, last_day)
+    n_days = np.clip(hi - lo + 1, 0, None)
+    n_extra = np.clip(np.minimum(hi, np.ceil(remainder) - 1) - lo + 1, 0, None)
+    # Totais ausentes somam zero, como no groupby().sum() das linhas diárias.
+    return np.nan_to_num(np.where(n_days > 0, base * n_days + n_extra, 0))
+
+
+def quota_intervals(df_alloc):
+    """Dias de entrega, totais das metas e nº de dias com linhas no plano de cada cota."""
+    days = delivery_days(df_alloc)
+    goals = {col: quota_column(df_alloc, source, 0) for col, source in GOAL_COLUMNS.items()}
+    active_days = np.maximum(*(_leading_days(totals, days) for totals in goals.values()))
+    return days, goals, active_days
+
+
+class IntervalPlan:
+    """Uma linha por cota ativa com as mesmas dimensões que o plano diário teria."""
+
+    def __init__(self, df_alloc, today=None, quota_dims=None, compact=False):
+        """`quota_dims` permite reaproveitar dimensões já decodificadas (ver pipeline.py).
+
+        Com `compact=True` as cotas e as linhas materializadas usam o esquema de compact_plan().
+        """
+        self.df_alloc = df_alloc
+        self.today = date.today() if today is None else today
+        self.compact = compact
+        days, goals, active_days = quota_intervals(df_alloc)
+        active = active_days > 0
+
+        quotas = df_alloc[active].copy()
+        quotas.columns = row_field_names(df_alloc.columns)
+        if not quotas.empty:
+            if quota_dims is None:
+                quota_dims = parse_quota_definitions(df_alloc, quotas.index)
+            quotas = quotas.join(quota_dims)
+            quotas['project_id'] = quotas['project_id'].astype(str)
+            if compact:
+                quotas = compact_plan(quotas)
+        alloc_columns = set(row_field_names(df_alloc.columns))
+        self.dim_columns = [col for col in quotas.columns if col not in alloc_columns]
+        quotas['original_quota_index'] = quotas.index
+        self.quotas = quotas
+        self.days = days[active]
+        self.active_days = active_days[active]
+        self.goals = {col: totals[active] for col, totals in goals.items()}
+
+    @property
+    def empty(self):
+        return self.quotas.empty
+
+    def __len__(self):
+        """Número de linhas que o plano diário materializado teria."""
+        return int(self.active_days.sum())
+
+    def date_bounds(self):
+        # Plano vazio: só o dia de hoje.
+        return self.today, self.today + timedelta(days=int(self.active_days.max(initial=1)) - 1)
+
+    def offsets(self, start=None, end=None):
+        """Intervalo de dias (relativos a hoje) correspondente às datas `start`..`end`."""
+        lo = 0 if start is None else (start - self.today).days
+        hi = int(self.days.max(initial=0)) if end is None else (end - self.today).days
+        return lo, hi
+
+    def _plan_rows(self, lo, hi):
+        return np.clip(np.minimum(hi, self.active_days - 1) - max(lo, 0) + 1, 0, None)
+
+    def active_mask(self, start=None, end=None):
+        """Máscara das cotas que têm ao menos uma linha diária entre `start` e `end`."""
+        return self._plan_rows(*self.offsets(start, end)) > 0
+
+    def period(self, start=None, end=None, mask=None):
+        """Cotas com linhas no período e as somas das metas diárias entre `start` e `end`.
+
+        As colunas de metas têm os mesmos nomes do plano diário, então o resultado
+        pode ser filtrado e agrupado como se fossem as linhas do plano. `mask`
+        restringe o cálculo a um subconjunto das cotas.
+        """
+        lo, hi = self.offsets(start, end)
+        plan_rows = self._plan_rows(lo, hi)
+        in_period = plan_rows > 0 if mask is None else (plan_rows > 0) & mask
+        df_period = self.quotas[in_period].copy()
+        for col, totals in self.goals.items():
+            df_period[col] = split_sum(totals[in_period], self.days[in_period], lo, hi,
+                                       self.active_days[in_period])
+        df_period['plan_rows'] = plan_rows[in_period]
+        return df_period
+
+    def plan_rows(self, start=None, end=None):
+        """Nº de linhas diárias de cada cota entre `start` e `end`."""
+        return self._plan_rows(*self.offsets(start, end))
+
+    def materialize(self, start=None, end=None, quota_index=None):
+        """Linhas diárias (como build_plan) das cotas `quota_index` dentro do período.
+
+        Reaproveita as dimensões já decodificadas em `quotas` e só expande os
+        dias do período, então o custo é proporcional apenas às linhas geradas,
+        não ao horizonte do plano.
+        """
+        df_alloc = self.df_alloc if quota_index is None else self.df_alloc.loc[quota_index]
+        window = None if start is None and end is None else self.offsets(start, end)
+        df_plan = expand_plan(df_alloc, self.today, window)
+        if df_plan.empty:
+            return df_plan
+        df_plan = attach_quota_dims(df_plan, self.quotas[self.dim_columns])
+        df_plan['project_id'] = df_plan['project_id'].astype(str)
+        return compact_plan(df_plan) if self.compact else df_plan
@@ -1,101 +1,74 @@
 import streamlit as st
 import pandas as pd
-import os
 import plotly.express as px
-import ast
-from datetime import date, timedelta
+from datetime import timedelta
+import perf
+import report_search
+import scenarios
+from paged_table import FrameSource, PlanSource, render_paged_table
+from plan_store import replace_watcher
+from zoneinfo import ZoneInfo
 
 st.set_page_config(layout="wide")
 
 st.title("Dynamic Recruitment Dashboard")
 
+perf_recorder = perf.Recorder(perf.is_enabled(st), script='meu_dashboard.py')
+
 ALLOC_FILE = 'GeminiCheck.csv'
 PROJECTS_FILE = 'Projects.csv'
 REPORT_FILE = 'Report.xlsx'
 
+FILTER_OPTIONS = {
+    '2. Projeto(s)': 'project_id', '3. País(es)': 'country', '4. Recrutamento': 'Recruitment',
+    '5. Região(ões)': 'Region', '6. Faixa Etária': 'age_group', '7. Gênero': 'Gender',
+    '8. Classe Social (SEL)': 'SEL'
+}
+
+
+@st.cache_resource
+def load_watcher(alloc_path, projects_path, report_path):
+    # Um único watcher por processo (o anterior é parado se o cache for limpo); a thread dele
+    # publica um novo PlanStore quando os arquivos mudam.
+    return replace_watcher(alloc_path, projects_path, report_path, list(FILTER_OPTIONS.values()))
+
+
+@st.cache_resource(max_entries=1)
+def load_report_index(_df_report, version):
+    # Uma entrada por versão do store; max_entries=1 libera o índice da versão anterior.
+    return report_search.update_index(_df_report)[0]
+
+
+def format_timestamp(moment):
+    return moment.astimezone(ZoneInfo("America/Sao_Paulo")).strftime("%d/%m/%Y %H:%M:%S (GMT%z)")
+
+
+df_plan = df_projects_original = df_report = None
+with perf_recorder.span('load_store') as span:
+    watcher = load_watcher(ALLOC_FILE, PROJECTS_FILE, REPORT_FILE)
+    # Lido uma única vez: o rerun inteiro usa o mesmo snapshot, mesmo que outro seja publicado no meio.
+    store = watcher.snapshot
+    span.rows_out = len(store.plan.quotas) if store is not None else 0
+
+if store is None:
+    st.error(watcher.error)
+else:
+    if watcher.error:
+        st.warning(f"{watcher.error} Exibindo a versão {store.version}.")
+    st.caption(f"Dados: versão {store.version}, carregados em {format_timestamp(store.loaded_at)} · "
+               f"última atualização dos arquivos: {format_timestamp(store.source_modified_at())}")
+    df_plan, df_projects_original, df_report = store.plan, store.df_projects, store.df_report
+    demand_cube, filter_index = store.cube, store.filter_index
 
-@st.cache_data
-def load_data(alloc_path, projects_path, report_path):
-    if not all(os.path.exists(p) for p in [alloc_path, projects_path, report_path]):
-        st.error("Um ou mais arquivos de dados não foram encontrados. Verifique os caminhos.")
-        return None, None, None
-    df_alloc = pd.read_csv(alloc_path)
-    df_projects = pd.read_csv(projects_path)
-    df_report = pd.read_excel(report_path)
-    return df_alloc, df_projects, df_report
-
-
-@st.cache_data
-def generate_plan(_df_alloc):
-    today = date.today()
-    daily_plan = []
-    for row in _df_alloc.itertuples():
-        total_recruits = getattr(row, 'Pessoas_Para_Recrutar', 0)
-        total_allocated = getattr(row, 'allocated_completes', 0)
-        days_to_deliver = getattr(row, 'DaystoDeliver', 1.0)
-        if pd.isna(days_to_deliver) or days_to_deliver < 1:
-            days_to_deliver = 1
-        days_to_deliver = int(days_to_deliver)
-        base_goal = total_recruits // days_to_deliver
-        remainder = total_recruits % days_to_deliver
-        base_allocated = total_allocated // days_to_deliver
-        remainder_allocated = total_allocated % days_to_deliver
-        for i in range(days_to_deliver):
-            plan_date = today + timedelta(days=i)
-            daily_goal = base_goal + 1 if i < remainder else base_goal
-            daily_allocated_goal = base_allocated + 1 if i < remainder_allocated else base_allocated
-            if daily_goal > 0 or daily_allocated_goal > 0:
-                new_row = row._asdict()
-                new_row.update({
-                    'plan_date': plan_date,
-                    'daily_recruitment_goal': daily_goal,
-                    'daily_allocated_goal': daily_allocated_goal,
-                    'original_quota_index': row.Index
-                })
-                del new_row['Index']
-                daily_plan.append(new_row)
-    if not daily_plan:
-        return pd.DataFrame()
-    df_daily_plan = pd.DataFrame(daily_plan)
-    df_daily_plan['plan_date'] = pd.to_datetime(df_daily_plan['plan_date']).dt.date
-
-    def extract_dynamic_data(row_series):
-        try:
-            keys = ast.literal_eval(row_series['cotas'])
-            values = ast.literal_eval(row_series['resultado_cota'])
-            if isinstance(keys, (list, tuple)) and len(keys) == len(values):
-                return dict(zip(keys, values))
-        except Exception:
-            return {}
-        return {}
-
-    dynamic_data = df_daily_plan.apply(extract_dynamic_data, axis=1)
-    dynamic_df = pd.DataFrame(dynamic_data.tolist(), index=df_daily_plan.index)
-    df_daily_plan_processed = pd.concat([df_daily_plan, dynamic_df], axis=1)
-    for col, replacement in {'Region': 'Any Region', 'SEL': 'Country without SEL'}.items():
-        if col in df_daily_plan_processed.columns:
-            df_daily_plan_processed[col] = df_daily_plan_processed[col].astype(str).replace('0', replacement)
-    df_daily_plan_processed['project_id'] = df_daily_plan_processed['project_id'].astype(str)
-    return df_daily_plan_processed
-
-
-df_alloc_original, df_projects_original, df_report = load_data(ALLOC_FILE, PROJECTS_FILE, REPORT_FILE)
-
-df_plan = pd.DataFrame()
-if df_alloc_original is not None:
-    df_plan = generate_plan(df_alloc_original)
-    if df_projects_original is not None:
-        df_projects_original['project_id'] = df_projects_original['project_id'].astype(str)
-
-tab_charts, tab_tables = st.tabs(["Demand Charts", "Data Tables"])
+tab_charts, tab_tables, tab_scenarios = st.tabs(["Demand Charts", "Data Tables", "Cenários"])
 
 if df_plan is not None and not df_plan.empty:
     st.sidebar.header("Filtros")
     use_date_filter = st.sidebar.checkbox("Filtrar por período")
-    df_filtered_by_date = df_plan.copy()
+    start_date = end_date = None
     header_title = "Demanda Geral de Recrutamento"
     if use_date_filter:
-        min_date, max_date = df_plan['plan_date'].min(), df_plan['plan_date'].max()
+        min_date, max_date = df_plan.date_bounds()
         selected_range = st.sidebar.date_input(
             "1. Selecione o Período",
             value=(min_date, min_date + timedelta(days=7)),
@@ -103,41 +76,39 @@ if df_plan is not None and not df_plan.empty:
         )
         if len(selected_range) == 2:
             start_date, end_date = selected_range
-            df_filtered_by_date = df_plan[df_plan['plan_date'].between(start_date, end_date)]
             header_title = f"Demanda de Recrutamento de: {start_date:%d/%m/%Y} a {end_date:%d/%m/%Y}"
 
-    df_filtered = df_filtered_by_date
-    df_projects_filtered = df_projects_original.copy() if df_projects_original is not None else pd.DataFrame()
-
-    filter_options = {
-        '2. Projeto(s)': 'project_id', '3. País(es)': 'country', '4. Recrutamento': 'Recruitment',
-        '5. Região(ões)': 'Region', '6. Faixa Etária': 'age_group', '7. Gênero': 'Gender',
-        '8. Classe Social (SEL)': 'SEL'
-    }
-    for label, col in filter_options.items():
-        if col in df_filtered.columns:
-            options = sorted(df_filtered[col].dropna().unique())
-            if options:
-                if col == 'Recruitment':
-                    default_value = ['Yes'] if 'Yes' in options else []
-                    selected = st.sidebar.multiselect(label, options, default=default_value)
-                else:
-                    selected = st.sidebar.multiselect(label, options)
-                if selected:
-                    df_filtered = df_filtered[df_filtered[col].isin(selected)]
-                    if not df_projects_filtered.empty and col in df_projects_filtered.columns:
-                        df_projects_filtered = df_projects_filtered[df_projects_filtered[col].isin(selected)]
+    with perf_recorder.span('filters', rows_in=len(demand_cube.cells)) as span:
+        cell_mask = demand_cube.active_mask(start_date, end_date)
+        projects_mask = pd.Series(True, index=df_projects_original.index)
+
+        for label, col in FILTER_OPTIONS.items():
+            if col in filter_index:
+                options = filter_index.options(col, cell_mask)
+                if options:
+                    if col == 'Recruitment':
+                        default_value = ['Yes'] if 'Yes' in options else []
+                        selected = st.sidebar.multiselect(label, options, default=default_value)
+                    else:
+                        selected = st.sidebar.multiselect(label, options)
+                    if selected:
+                        cell_mask &= filter_index.select(col, selected)
+                        if col in df_projects_original.columns:
+                            projects_mask &= df_projects_original[col].isin(selected)
+        span.rows_out = int(cell_mask.sum())
+
+    with perf_recorder.span('kpi_totals', rows_in=len(demand_cube)):
+        totals = demand_cube.totals(start_date, end_date, cell_mask)
 
     with tab_charts:
         st.header(header_title)
-        if df_filtered.empty:
+        if totals['plan_rows'] == 0:
             st.warning("Nenhuma meta de recrutamento encontrada para os filtros selecionados.")
         else:
             st.markdown("---")
-            recruitment_goal = df_filtered['daily_recruitment_goal'].sum()
-            allocated_goal = df_filtered['daily_allocated_goal'].sum()
-            unique_quota_indices = df_filtered['original_quota_index'].unique()
-            total_completes_needed = df_alloc_original.loc[unique_quota_indices, 'allocated_completes'].sum()
+            recruitment_goal = totals['daily_recruitment_goal']
+            allocated_goal = totals['daily_allocated_goal']
+            total_completes_needed = totals['allocated_completes']
 
             kpi1, kpi2, kpi3 = st.columns(3)
             kpi1.metric(label="Recrutamento Necessário (Período)", value=f"{int(recruitment_goal):,}")
@@ -157,27 +128,84 @@ if df_plan is not None and not df_plan.empty:
             cols = [col1, col2, col1, col2]
             chart_idx = 0
             for col_name, title in charts_to_display.items():
-                if col_name in df_filtered.columns:
+                if col_name in demand_cube.dimensions:
                     with cols[chart_idx % 4]:
-                        grouped_data = df_filtered.groupby(col_name)['daily_recruitment_goal'].sum().sort_values(ascending=False).reset_index()
-                        if col_name == 'Gender':
-                            fig = px.pie(grouped_data, names=col_name, values='daily_recruitment_goal', title=title, hole=0.3, color_discrete_sequence=custom_colors)
-                        else:
-                            fig = px.bar(grouped_data, x=col_name, y='daily_recruitment_goal', title=title, color_discrete_sequence=custom_colors)
-                        st.plotly_chart(fig, use_container_width=True)
+                        with perf_recorder.span(f'groupby_{col_name}', rows_in=len(demand_cube)) as span:
+                            grouped_data = demand_cube.breakdown(col_name, start_date, end_date, cell_mask).reset_index()
+                            span.rows_out = len(grouped_data)
+                        with perf_recorder.span(f'figure_{col_name}', rows_in=len(grouped_data)):
+                            if col_name == 'Gender':
+                                fig = px.pie(grouped_data, names=col_name, values='daily_recruitment_goal', title=title, hole=0.3, color_discrete_sequence=custom_colors)
+                            else:
+                                fig = px.bar(grouped_data, x=col_name, y='daily_recruitment_goal', title=title, color_discrete_sequence=custom_colors)
+                        with perf_recorder.span(f'plotly_chart_{col_name}'):
+                            st.plotly_chart(fig, use_container_width=True)
                         chart_idx += 1
 
     with tab_tables:
         if df_report is not None:
             st.header("Dados do Relatório de Recrutamento")
-            st.dataframe(df_report)
+            with perf_recorder.span('dataframe_report', rows_in=len(df_report)):
+                render_paged_table(st, 'report', FrameSource(df_report))
+
+            st.subheader("Busca no Relatório")
+            search_cols = st.columns([4, 1])
+            query = search_cols[0].text_input("Consulta", placeholder="ex.: AR Female 18to30 Centro", key='report_query')
+            top_k = search_cols[1].number_input("Resultados", 1, 100, 10, key='report_top_k')
+            if query.strip():
+                # O índice só é aberto (e atualizado, se o relatório mudou) na primeira consulta.
+                with perf_recorder.span('report_search', rows_in=len(df_report)) as span:
+                    rows, scores = load_report_index(df_report, store.version).search(query, int(top_k))
+                    span.rows_out = len(rows)
+                st.dataframe(df_report.iloc[rows].assign(similaridade=scores), hide_index=True)
 
         st.header("Plano de Recrutamento Detalhado")
         display_cols = ['plan_date', 'daily_recruitment_goal', 'daily_allocated_goal', 'project_id', 'country', 'Recruitment', 'age_group', 'SEL', 'Gender', 'Region', 'Pessoas_Para_Recrutar', 'allocated_completes', 'DaystoDeliver']
-        st.dataframe(df_filtered[[col for col in display_cols if col in df_filtered.columns]].reset_index(drop=True))
-        st.info(f"Mostrando {len(df_filtered)} de {len(df_plan)} atividades planejadas.")
+        with perf_recorder.span('dataframe_plan') as span:
+            plan_source = PlanSource(df_plan, start_date, end_date, demand_cube.quota_mask(cell_mask))
+            plan_columns = [col for col in display_cols if col in plan_source.columns]
+            span.rows_in = render_paged_table(st, 'plan', plan_source, plan_columns)
+        st.info(f"Mostrando {plan_source.total()} de {len(df_plan)} atividades planejadas.")
 
-        if not df_projects_filtered.empty:
+        if projects_mask is not None and projects_mask.any():
             st.header("Dados Originais dos Projetos")
-            st.dataframe(df_projects_filtered)
-            st.info(f"Mostrando {len(df_projects_filtered)} de {len(df_projects_original)} projetos.")
+            projects_source = FrameSource(df_projects_original, projects_mask)
+            with perf_recorder.span('dataframe_projects', rows_in=projects_source.total()):
+                render_paged_table(st, 'projects', projects_source)
+            st.info(f"Mostrando {projects_source.total()} de {len(df_projects_original)} projetos.")
+
+    with tab_scenarios:
+        st.header("Cenários: e se...?")
+        st.caption("Aplicados às cotas dos filtros da barra lateral; dia 0 = hoje.")
+        preset_names = st.multiselect("Cenários predefinidos", list(scenarios.SCENARIO_PRESETS),
+                                      default=list(scenarios.SCENARIO_PRESETS), key='scenario_presets')
+        custom_cols = st.columns(4)
+        delay_days = custom_cols[0].number_input("Atraso no prazo (dias)", -60, 120, 0, key='scenario_delay')
+        start_offset = custom_cols[1].number_input("Início em (dias)", 0, 120, 0, key='scenario_start')
+        split = custom_cols[2].radio("Divisão diária", ["Uniforme", "Antecipada"], horizontal=True, key='scenario_split')
+        front_share = custom_cols[3].slider("% na 1ª metade", 50, 95, 70, key='scenario_front_share')
+        scenario_list = [{'name': name, **scenarios.SCENARIO_PRESETS[name]} for name in preset_names]
+        if delay_days or start_offset or split == "Antecipada":
+            scenario_list.append({
+                'name': 'Personalizado', 'delay_days': int(delay_days), 'start_offset': int(start_offset),
+                'split': 'front' if split == "Antecipada" else 'even', 'front_share': front_share / 100,
+            })
+
+        if scenario_list:
+            with perf_recorder.span('scenarios', rows_in=len(scenario_list)) as span:
+                scenario_table = scenarios.scenario_table(df_plan, demand_cube.quota_mask(cell_mask))
+                # Poucos cenários são avaliados no próprio processo; o pool é para lotes (scenarios.py).
+                results = scenarios.evaluate_scenarios(scenario_table, scenario_list, workers=1)
+                summary = scenarios.summarize(results)
+                span.rows_out = len(summary)
+            st.dataframe(summary.rename(columns={
+                'scenario': 'Cenário', 'total': 'Recrutamento total', 'next_7_days': 'Próximos 7 dias',
+                'next_30_days': 'Próximos 30 dias', 'peak_day_goal': 'Pico diário', 'peak_day': 'Dia do pico',
+                'last_day': 'Último dia',
+            }), hide_index=True)
+            daily = scenarios.daily_frame(results).reset_index().melt('day', var_name='Cenário', value_name='Meta diária')
+            fig = px.line(daily, x='day', y='Meta diária', color='Cenário', title="Meta diária de recrutamento por cenário",
+                          labels={'day': 'Dias a partir de hoje'})
+            st.plotly_chart(fig, use_container_width=True)
+
+perf.render_panel(st, perf_recorder, store.load_timings if store is not None else None)
@@ -0,0 +1,144 @@
+"""Tabelas paginadas no servidor para a aba "Data Tables".
+
+Cada fonte sabe informar o total de linhas sem materializá-las e devolver
+apenas a janela pedida, já ordenada e com as colunas escolhidas; o navegador
+recebe só a página visível.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [50, 100, 500, 1000]
+NO_SORT = "(ordem original)"
+
+
+def _sort_positions(values, ascending):
+    # Mesma ordem de sort_values(kind='stable', na_position='last'); `values` é uma Series para
+    # manter o dtype (categorias ordenadas, como DayName, seguem a ordem das categorias).
+    order = values.reset_index(drop=True).sort_values(ascending=ascending, kind='stable', na_position='last')
+    return order.index.to_numpy()
+
+
+class FrameSource:
+    """Fonte sobre um DataFrame já em memória, com filtro opcional por máscara de linhas."""
+
+    def __init__(self, df, mask=None):
+        self.df = df
+        self.positions = np.arange(len(df)) if mask is None else np.flatnonzero(np.asarray(mask))
+        self.columns = list(df.columns)
+
+    def total(self):
+        return len(self.positions)
+
+    def page(self, offset, limit, sort_by=None, ascending=True, columns=None):
+        positions = self.positions
+        if sort_by is not None:
+            positions = positions[_sort_positions(self.df[sort_by].iloc[positions], ascending)]
+        window = self.df.iloc[positions[offset:offset + limit]]
+        return window[columns or self.columns].reset_index(drop=True)
+
+
+class PlanSource:
+    """Linhas diárias de um IntervalPlan no período, para as cotas de `quota_mask`.
+
+    Sem ordenação ou ordenando por plan_date/colunas da cota, só as cotas que
+    cobrem a página são materializadas. Ordenar pelas metas diárias, que variam
+    dia a dia, materializa as cotas filtradas (nunca o plano inteiro).
+    """
+
+    def __init__(self, plan, start=None, end=None, quota_mask=None, columns=None):
+        self.plan, self.start, self.end = plan, start, end
+        rows = plan.plan_rows(start, end)
+        selected = rows > 0 if quota_mask is None else (rows > 0) & quota_mask
+        self.quota_pos = np.flatnonzero(selected)
+        self.rows = rows[self.quota_pos]
+        self.first_day = max(plan.offsets(start, end)[0], 0)
+        self.columns = columns or ['plan_date', *plan.goals, *plan.quotas.columns]
+
+    def total(self):
+        return int(self.rows.sum())
+
+    def _materialize(self, quota_pos, start=None, end=None):
+        quota_index = self.plan.quotas.index[quota_pos]
+        if start is None and end is None:
+            start, end = self.start, self.end
+        return self.plan.materialize(start, end, quota_index)
+
+    def _quota_major(self, quota_pos, rows, offset, limit):
+        # Linhas em ordem de cota e, dentro da cota, por dia: acha as cotas que cobrem a janela.
+        ends = np.cumsum(rows)
+        first = np.searchsorted(ends, offset, side='right')
+        last = np.searchsorted(ends, offset + limit, side='left')
+        chosen = quota_pos[first:last + 1]
+        if not len(chosen):
+            return pd.DataFrame(columns=self.columns)
+        df = self._materialize(np.sort(chosen))
+        order = pd.Index(self.plan.quotas.index[chosen]).get_indexer(df['original_quota_index'])
+        df = df.take(np.argsort(order, kind='stable')).reset_index(drop=True)
+        skip = offset - (ends[first - 1] if first > 0 else 0)
+        return df.iloc[skip:skip + limit]
+
+    def _date_major(self, offset, limit, ascending):
+        # Linhas por dia e, dentro do dia, na ordem das cotas (como um sort estável por plan_date).
+        last_day = self.first_day + self.rows - 1
+        days = np.arange(self.first_day, last_day.max() + 1) if len(last_day) else np.arange(0)
+        if not ascending:
+            days = days[::-1]
+        per_day = len(last_day) - np.searchsorted(np.sort(last_day), days, side='left')
+        ends = np.cumsum(per_day)
+        first = np.searchsorted(ends, offset, side='right')
+        last = np.searchsorted(ends, offset + limit, side='left')
+        keys = []
+        for i in range(first, min(last + 1, len(days))):
+            day_start = ends[i] - per_day[i]
+            active = self.quota_pos[last_day >= days[i]]
+            window = active[max(offset - day_start, 0):offset + limit - day_start]
+            keys.extend((pos, days[i]) for pos in window)
+        if not keys:
+            return pd.DataFrame(columns=self.columns)
+
+        key_pos, key_day = map(np.array, zip(*keys))
+        start = self.plan.today + timedelta(days=int(key_day.min()))
+        end = self.plan.today + timedelta(days=int(key_day.max()))
+        df = self._materialize(np.unique(key_pos), start, end)
+        day_offset = (pd.to_datetime(df['plan_date']) - pd.Timestamp(self.plan.today)).dt.days
+        row_keys = pd.MultiIndex.from_arrays([df['original_quota_index'], day_offset])
+        wanted = pd.MultiIndex.from_arrays([self.plan.quotas.index[key_pos], key_day])
+        return df.take(row_keys.get_indexer(wanted))
+
+    def page(self, offset, limit, sort_by=None, ascending=True, columns=None):
+        columns = columns or self.columns
+        if sort_by is None:
+            df = self._quota_major(self.quota_pos, self.rows, offset, limit)
+        elif sort_by == 'plan_date':
+            df = self._date_major(offset, limit, ascending)
+        elif sort_by in self.plan.quotas.columns:
+            order = _sort_positions(self.plan.quotas[sort_by].iloc[self.quota_pos], ascending)
+            df = self._quota_major(self.quota_pos[order], self.rows[order], offset, limit)
+        else:
+            df = self._materialize(self.quota_pos) if len(self.quota_pos) else pd.DataFrame(columns=self.columns)
+            df = df.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+            df = df.iloc[offset:offset + limit]
+        return df.reindex(columns=columns).reset_index(drop=True)
+
+
+def render_paged_table(st, key, source, columns=None, default_columns=None):
+    """Controles de ordenação, colunas e página + a janela correspondente em st.dataframe."""
+    columns = columns or source.columns
+    total = source.total()
+    controls = st.columns([3, 1, 1, 1])
+    sort_by = controls[0].selectbox("Ordenar por", [NO_SORT, *columns], key=f"{key}_sort")
+    ascending = controls[1].radio("Ordem", ["Asc", "Desc"], horizontal=True, key=f"{key}_order") == "Asc"
+    page_size = controls[2].selectbox("Linhas por página", PAGE_SIZES, index=1, key=f"{key}_size")
+    n_pages = max(1, -(-total // page_size))
+    page_number = controls[3].number_input("Página", 1, n_pages, 1, key=f"{key}_page")
+    shown = st.multiselect("Colunas", columns, default=default_columns or columns, key=f"{key}_columns")
+
+    offset = (int(page_number) - 1) * page_size
+    window = source.page(offset, page_size, None if sort_by == NO_SORT else sort_by, ascending, shown or columns)
+    st.dataframe(window, hide_index=True)
+    if total:
+        st.caption(f"Linhas {offset + 1:,}–{min(offset + page_size, total):,} de {total:,} "
+                   f"(página {page_number} de {n_pages})")
+    return total
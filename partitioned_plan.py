@@ -0,0 +1,184 @@
+"""Plano diário gravado como dataset particionado por país e semana.
+
+Layout (estilo hive), um arquivo Arrow por bloco que gerou linhas na partição:
+
+    <dir>/country=AR/week=2025-34/part-00003.arrow
+    <dir>/country=AR/week=2025-34/part-00003.json   (estatísticas do arquivo)
+    <dir>/_manifest.json                            (todas as estatísticas juntas)
+
+Cada bloco de cotas pode ser gravado por um processo ou máquina diferente
+(nomes de arquivo distintos); merge_manifest() só varre os .json e monta o
+manifesto. A leitura consulta o manifesto e abre apenas as partições do país
+e das semanas pedidas; dentro de cada arquivo as linhas estão ordenadas por
+plan_date, então o recorte de datas é uma busca binária.
+
+PartitionCube responde às mesmas consultas do DemandCube (totals, breakdown)
+só com as linhas lidas, para quem precisa de alguns países sem planejar a
+alocação global (ex.: batch_queries.py --partitioned DIR --country AR).
+
+A leitura por partições atende batch_queries.py e quem chama
+read_partitions()/PartitionCube; o dashboard (meu_dashboard.py) lê o plano
+global da PlanStore.
+"""
+import glob
+import json
+import os
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from data_cache import read_arrow, write_arrow, write_json_atomic
+from demand_cube import CUBE_DIMENSIONS, CellQueries
+from plan_engine import compact_plan, quota_column
+
+MANIFEST_FILE = '_manifest.json'
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+GOALS = ['daily_recruitment_goal', 'daily_allocated_goal']
+
+
+def week_key(dates):
+    """Semana ISO de cada data no formato YYYY-WW."""
+    iso = pd.to_datetime(pd.Series(dates)).dt.isocalendar()
+    return iso['year'].astype(str) + '-' + iso['week'].astype(str).str.zfill(2)
+
+
+def partition_dir(directory, country, week):
+    country = NULL_PARTITION if pd.isna(country) else quote(str(country), safe='')
+    return os.path.join(directory, f'country={country}', f'week={week}')
+
+
+def write_partitions(df_plan, directory, part_name):
+    """Grava as linhas de `df_plan` nas partições país/semana; devolve as estatísticas por arquivo."""
+    if df_plan.empty:
+        return []
+    dates = pd.to_datetime(df_plan['plan_date'])
+    weeks = week_key(dates).to_numpy()
+    countries = df_plan['country'].astype(object).to_numpy()
+    stats = []
+    for (country, week), positions in pd.DataFrame({'c': countries, 'w': weeks}).groupby(
+            ['c', 'w'], dropna=False, sort=True).indices.items():
+        order = positions[np.argsort(dates.to_numpy()[positions], kind='stable')]
+        part = df_plan.take(order).reset_index(drop=True)
+        target = partition_dir(directory, country, week)
+        os.makedirs(target, exist_ok=True)
+        write_arrow(part, os.path.join(target, f'{part_name}.arrow'))
+        part_dates = dates.to_numpy()[order]
+        record = {
+            'country': None if pd.isna(country) else str(country),
+            'week': week,
+            'file': os.path.relpath(os.path.join(target, f'{part_name}.arrow'), directory),
+            'rows': len(part),
+            'quotas': int(part['original_quota_index'].nunique()),
+            'min_date': str(pd.Timestamp(part_dates[0]).date()),
+            'max_date': str(pd.Timestamp(part_dates[-1]).date()),
+            **{col: float(part[col].sum()) for col in GOALS if col in part},
+        }
+        write_json_atomic(os.path.join(target, f'{part_name}.json'), record, indent=1)
+        stats.append(record)
+    return stats
+
+
+def merge_manifest(directory):
+    """Junta as estatísticas de todos os arquivos do dataset em _manifest.json."""
+    records = []
+    for path in sorted(glob.glob(os.path.join(directory, 'country=*', 'week=*', '*.json'))):
+        with open(path) as f:
+            records.append(json.load(f))
+    write_json_atomic(os.path.join(directory, MANIFEST_FILE), {'parts': records}, indent=1)
+    return records
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        return pd.DataFrame(json.load(f)['parts'])
+
+
+def partition_stats(directory):
+    """Estatísticas agregadas por partição (país, semana)."""
+    parts = read_manifest(directory)
+    if parts.empty:
+        return parts
+    aggregations = {'rows': 'sum', 'quotas': 'sum', 'min_date': 'min', 'max_date': 'max', 'file': 'count'}
+    aggregations.update({col: 'sum' for col in GOALS if col in parts})
+    return parts.groupby(['country', 'week'], dropna=False).agg(aggregations).rename(columns={'file': 'files'})
+
+
+def _date_slice(part, start, end):
+    dates = pd.to_datetime(part['plan_date']).to_numpy()
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side='left')
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side='right')
+    return part.iloc[lo:hi]
+
+
+def read_partitions(directory, countries=None, start=None, end=None, compact=True):
+    """Linhas do plano dos países `countries` entre `start` e `end`, lendo só as partições necessárias."""
+    parts = read_manifest(directory)
+    if parts.empty:
+        return pd.DataFrame()
+    keep = np.ones(len(parts), dtype=bool)
+    if countries is not None:
+        keep &= parts['country'].isin([str(country) for country in countries]).to_numpy()
+    if start is not None:
+        keep &= (parts['max_date'] >= str(start)).to_numpy()
+    if end is not None:
+        keep &= (parts['min_date'] <= str(end)).to_numpy()
+    frames = [_date_slice(read_arrow(os.path.join(directory, path)), start, end)
+              for path in parts.loc[keep, 'file']]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    # Categorias de arquivos diferentes não se concatenam; o esquema compacto é refeito no final.
+    df_plan = pd.concat([frame.astype({col: object for col in frame.columns
+                                       if isinstance(frame[col].dtype, pd.CategoricalDtype)})
+                         for frame in frames], ignore_index=True)
+    return compact_plan(df_plan) if compact else df_plan
+
+
+class PartitionCube(CellQueries):
+    """Totais e quebras (como os do DemandCube) sobre linhas do plano lidas das partições.
+
+    Cada linha é uma célula; não há plano por intervalos nem trechos, então só
+    active_mask(), cell_sums() e as consultas do CellQueries estão disponíveis.
+
+    Os completes de cada cota entram uma vez, na primeira linha dela dentro do
+    período, então totals() e breakdown() dão o mesmo que o cubo do plano global
+    filtrado pelos mesmos países.
+    """
+
+    def __init__(self, df_plan):
+        self.dimensions = [col for col in CUBE_DIMENSIONS if col in df_plan.columns]
+        self.cells = df_plan[self.dimensions].reset_index(drop=True)
+        self.dates = pd.to_datetime(df_plan['plan_date']).to_numpy()
+        self.goals = {}
+        for col in GOALS:
+            values = df_plan[col].to_numpy()
+            # Metas ausentes somam zero, como no groupby().sum() das linhas.
+            integer = np.issubdtype(values.dtype, np.integer)
+            self.goals[col] = values.astype(np.int64) if integer else np.nan_to_num(values.astype('float64'))
+        self.quota = df_plan['original_quota_index'].to_numpy()
+        self.quota_completes = np.nan_to_num(quota_column(df_plan, 'allocated_completes', 0).astype('float64'))
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def active_mask(self, start=None, end=None):
+        """Linhas com plan_date entre `start` e `end`."""
+        mask = np.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= np.datetime64(pd.Timestamp(start))
+        if end is not None:
+            mask &= self.dates <= np.datetime64(pd.Timestamp(end))
+        return mask
+
+    def cell_sums(self, start=None, end=None):
+        active = self.active_mask(start, end)
+        sums = {col: np.where(active, values, 0) for col, values in self.goals.items()}
+        sums['plan_rows'] = active.astype(np.int64)
+        positions = np.flatnonzero(active)
+        first = positions[np.unique(self.quota[positions], return_index=True)[1]]
+        sums['allocated_completes'] = np.zeros(len(active))
+        sums['allocated_completes'][first] = self.quota_completes[first]
+        sums['active'] = active
+        return sums
@@ -0,0 +1,113 @@
+"""Instrumentação leve por etapa para os dashboards.
+
+Cada rerun cria um Recorder; `with recorder.span('etapa') as span:` mede
+duração e variação de memória (RSS) e aceita `span.rows_in` / `span.rows_out`.
+Desligado, `span()` devolve sempre o mesmo objeto inerte, sem medir nada.
+O painel fica escondido e é ativado com `?perf=1` na URL ou DASHBOARD_PERF=1.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+PERF_LOG_FILE = os.environ.get('DASHBOARD_PERF_LOG', 'perf_log.jsonl')
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except OSError:
+        return None
+
+
+class _NullSpan:
+    """Span inerte usado quando a instrumentação está desligada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, records, name, rows_in):
+        self._records = records
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self._rss = _rss_mb()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        rss = _rss_mb()
+        self._records.append({
+            'stage': self.name,
+            'ms': round(seconds * 1000, 3),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'mem_delta_mb': round(rss - self._rss, 2) if rss is not None and self._rss is not None else None,
+        })
+        return False
+
+
+class Recorder:
+
+    def __init__(self, enabled=False, script=None):
+        self.enabled = enabled
+        self.script = script
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.records = []
+
+    def span(self, name, rows_in=None):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.records, name, rows_in)
+
+    def to_jsonl(self):
+        return ''.join(
+            json.dumps({'run': self.started_at, 'script': self.script, **record}, default=int) + '\n'
+            for record in self.records
+        )
+
+    def export(self, path=PERF_LOG_FILE):
+        with open(path, 'a') as f:
+            f.write(self.to_jsonl())
+
+
+def is_enabled(st):
+    return st.query_params.get('perf') == '1' or os.environ.get('DASHBOARD_PERF') == '1'
+
+
+def render_panel(st, recorder, load_records=None):
+    """Painel "Performance" na barra lateral com as etapas do rerun atual.
+
+    `load_records` são as etapas da carga do snapshot em uso (PlanStore.load_timings).
+    """
+    if not recorder.enabled:
+        return
+    with st.sidebar.expander("Performance", expanded=False):
+        total_ms = sum(record['ms'] for record in recorder.records)
+        st.caption(f"Rerun de {recorder.started_at}: {total_ms:,.1f} ms em {len(recorder.records)} etapas")
+        st.dataframe(recorder.records, hide_index=True)
+        if load_records:
+            load_ms = sum(record['ms'] for record in load_records)
+            st.caption(f"Carga dos dados (uma vez por versão dos arquivos): {load_ms:,.1f} ms")
+            st.dataframe(load_records, hide_index=True)
+        if st.button("Exportar para " + PERF_LOG_FILE):
+            recorder.export()
+            st.success(f"{len(recorder.records)} etapas gravadas em {PERF_LOG_FILE}.")
+        st.download_button("Baixar JSON lines", recorder.to_jsonl(), file_name='perf.jsonl', mime='application/jsonl')
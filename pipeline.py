@@ -0,0 +1,243 @@
+"""Pipeline carga -> plano -> decodificação das cotas -> agregados, fora do Streamlit.
+
+O passo pesado (decodificar `cotas`/`resultado_cota` e, opcionalmente,
+materializar o plano diário) roda em blocos num pool de processos. Os
+artefatos são gravados em Arrow IPC em PRECOMPUTED_DIR e o dashboard só os
+abre via memory-map, desde que correspondam ao arquivo de alocação atual e à
+ARTIFACT_VERSION do código.
+
+    python pipeline.py GeminiCheck.csv --workers 8
+    python pipeline.py GeminiCheck.csv --materialize --report-compact-memory
+    python pipeline.py GeminiCheck.csv --partitioned .data_cache/plan_dataset
+
+Com --materialize o plano diário fica em <output>/plan_snapshot (ver
+incremental_plan.py): no mesmo dia, uma nova execução reaproveita as linhas
+das cotas inalteradas e só expande as novas ou alteradas. O snapshot fica no
+esquema do build_plan(); --report-compact-memory só acrescenta ao resumo a
+memória por coluna que o plano ocuparia no esquema de compact_plan().
+
+Com --partitioned cada worker grava direto as partições país/semana do seu
+bloco (ver partitioned_plan.py); o processo principal só junta as estatísticas.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR, read_arrow, read_table, write_arrow, write_json_atomic
+from demand_cube import DemandCube
+from incremental_plan import refresh_plan
+from lazy_plan import IntervalPlan, quota_intervals
+from partitioned_plan import merge_manifest, write_partitions
+from plan_engine import build_plan, compact_plan, memory_report, normalize_placeholders, parse_quota_definitions
+
+PRECOMPUTED_DIR = os.path.join(CACHE_DIR, 'precomputed')
+CUBE_TABLES = ['cells', 'runs', 'completes', 'quota_cell', 'cell_last_day']
+# Aumentar sempre que o formato dos artefatos ou o cálculo do cubo/decodificação mudar:
+# artefatos de outra versão são ignorados e o plano/cubo é calculado na hora.
+ARTIFACT_VERSION = 1
+
+
+def alloc_fingerprint(df_alloc):
+    """Hash do conteúdo da alocação; os artefatos só valem para a mesma alocação."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df_alloc).to_numpy().tobytes())
+    digest.update(repr(list(df_alloc.columns)).encode())
+    return digest.hexdigest()
+
+
+def _parse_chunk(chunk):
+    active_days = quota_intervals(chunk)[2]
+    return parse_quota_definitions(chunk, chunk.index[active_days > 0])
+
+
+def _materialize_chunk(args):
+    chunk, today = args
+    return build_plan(chunk, today)
+
+
+def _partition_chunk(args):
+    chunk, today, directory, part_name = args
+    return len(write_partitions(build_plan(chunk, today, compact=True), directory, part_name))
+
+
+def _chunks(df_alloc, n_chunks):
+    bounds = np.linspace(0, len(df_alloc), n_chunks + 1).astype(int)
+    return [df_alloc.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def _run_parallel(func, items, workers):
+    if workers == 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, items))
+
+
+def parse_quotas_parallel(df_alloc, workers=None, chunks_per_worker=4):
+    """Dimensões das cotas ativas, decodificadas em blocos num pool de processos."""
+    workers = workers or os.cpu_count() or 1
+    parts = _run_parallel(_parse_chunk, _chunks(df_alloc, workers * chunks_per_worker), workers)
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(index=pd.Index([], name='original_quota_index'))
+    # Blocos sem Region/SEL não trazem a coluna; normalizar de novo deixa tudo igual ao cálculo único.
+    return normalize_placeholders(pd.concat(parts))
+
+
+def materialize_parallel(df_alloc, today=None, workers=None, chunks_per_worker=4, compact=False):
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(df_alloc, workers * chunks_per_worker)
+    parts = [part for part in _run_parallel(_materialize_chunk, [(chunk, today) for chunk in chunks], workers)
+             if not part.empty]
+    if not parts:
+        return pd.DataFrame()
+    df_plan = normalize_placeholders(pd.concat(parts, ignore_index=True))
+    # Compactado só depois de juntar: categorias de blocos diferentes não se concatenam.
+    return compact_plan(df_plan) if compact else df_plan
+
+
+def _swap_directory(staging, directory):
+    # O anterior é renomeado para o lado antes de `staging` entrar no lugar e só é apagado depois;
+    # se a troca falhar, ele volta. Leitores só ficam sem o dataset entre os dois renames.
+    old = f'{directory.rstrip(os.sep)}.{os.getpid()}.old'
+    shutil.rmtree(old, ignore_errors=True)
+    had_previous = os.path.exists(directory)
+    if had_previous:
+        os.replace(directory, old)
+    try:
+        os.replace(staging, directory)
+    except OSError:
+        if had_previous:
+            os.replace(old, directory)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def write_partitioned(df_alloc, directory, today=None, workers=None, chunks_per_worker=4):
+    """Grava o plano diário particionado por país/semana; cada bloco é gravado pelo seu worker.
+
+    O dataset é montado num diretório temporário e só então trocado pelo anterior (ver _swap_directory).
+    """
+    workers = workers or os.cpu_count() or 1
+    today = date.today() if today is None else today
+    staging = f'{directory.rstrip(os.sep)}.{os.getpid()}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    chunks = _chunks(df_alloc, workers * chunks_per_worker)
+    items = [(chunk, today, staging, f'part-{i:05d}') for i, chunk in enumerate(chunks)]
+    files = sum(_run_parallel(_partition_chunk, items, workers))
+    records = merge_manifest(staging)
+    _swap_directory(staging, directory)
+    return {
+        'directory': os.path.abspath(directory),
+        'plan_date': today.isoformat(),
+        'files': files,
+        'partitions': len({(record['country'], record['week']) for record in records}),
+        'rows': sum(record['rows'] for record in records),
+    }
+
+
+def precompute(alloc_path, directory=PRECOMPUTED_DIR, workers=None, materialize=False, compact_report=False):
+    """Gera os artefatos em `directory` e devolve um resumo com contagens e tempos."""
+    started = time.perf_counter()
+    df_alloc = read_table(alloc_path)
+    fingerprint = alloc_fingerprint(df_alloc)
+    quota_dims = parse_quotas_parallel(df_alloc, workers)
+    plan = IntervalPlan(df_alloc, quota_dims=quota_dims)
+    cube = DemandCube(plan)
+
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    write_arrow(quota_dims, os.path.join(directory, 'quota_dims.arrow'))
+    for name, table in cube.to_tables().items():
+        write_arrow(table, os.path.join(directory, f'cube_{name}.arrow'))
+    summary = {
+        'artifact_version': ARTIFACT_VERSION,
+        'alloc_path': os.path.abspath(alloc_path),
+        'alloc_fingerprint': fingerprint,
+        'quotas': len(df_alloc),
+        'active_quotas': len(plan.quotas),
+        'plan_rows': len(plan),
+        'cube_runs': len(cube),
+        'materialized_plan': materialize,
+        'compact_memory_report': compact_report,
+    }
+    if materialize:
+        # O plano diário depende da data de hoje; no mesmo dia só as cotas novas ou alteradas são expandidas.
+        df_plan, summary['plan_update'] = refresh_plan(
+            df_alloc, os.path.join(directory, 'plan_snapshot'), plan.today,
+            build=lambda chunk, today: materialize_parallel(chunk, today, workers))
+        summary['plan_date'] = plan.today.isoformat()
+        summary['plan_memory'] = memory_report(compact_plan(df_plan) if compact_report else df_plan)['bytes'].to_dict()
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    write_json_atomic(meta_path, summary, indent=2)
+    return summary
+
+
+def _load_meta(directory, df_alloc):
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('artifact_version') != ARTIFACT_VERSION:
+        return None
+    return meta if meta.get('alloc_fingerprint') == alloc_fingerprint(df_alloc) else None
+
+
+def load_plan(df_alloc, directory=PRECOMPUTED_DIR, compact=False):
+    """IntervalPlan dos artefatos pré-calculados (mesma alocação e ARTIFACT_VERSION), ou calculado na hora."""
+    meta = _load_meta(directory, df_alloc)
+    if meta is None:
+        return IntervalPlan(df_alloc, compact=compact)
+    quota_dims = read_arrow(os.path.join(directory, 'quota_dims.arrow'))
+    plan = IntervalPlan(df_alloc, quota_dims=quota_dims, compact=compact)
+    plan.precomputed_dir = directory
+    return plan
+
+
+def load_cube(plan):
+    """DemandCube dos artefatos do load_plan() se cobrirem as cotas do plano; senão constrói na hora."""
+    directory = getattr(plan, 'precomputed_dir', None)
+    if directory is None:
+        return DemandCube(plan)
+    tables = {name: read_arrow(os.path.join(directory, f'cube_{name}.arrow'), zero_copy=True) for name in CUBE_TABLES}
+    if len(tables['quota_cell']) != len(plan.quotas):
+        # Artefatos de outro plano (ex.: gravados pela metade): o cubo é calculado na hora.
+        return DemandCube(plan)
+    return DemandCube.from_tables(plan, tables)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcula o plano e seus agregados fora do Streamlit.")
+    parser.add_argument('alloc_path', nargs='?', default='GeminiCheck.csv')
+    parser.add_argument('--output', default=PRECOMPUTED_DIR)
+    parser.add_argument('--workers', type=int, help="processos no pool (padrão: todos os núcleos)")
+    parser.add_argument('--materialize', action='store_true', help="também grava o plano diário completo")
+    parser.add_argument('--report-compact-memory', action='store_true',
+                        help="com --materialize, informa no resumo a memória do plano diário convertido para "
+                             "categorias, inteiros reduzidos e datas datetime64 (o snapshot gravado não muda)")
+    parser.add_argument('--partitioned', metavar='DIR',
+                        help="também grava o plano diário particionado por país/semana em DIR")
+    args = parser.parse_args(argv)
+    if args.report_compact_memory and not args.materialize:
+        parser.error("--report-compact-memory exige --materialize")
+    if args.partitioned:
+        print(json.dumps(write_partitioned(read_table(args.alloc_path), args.partitioned, workers=args.workers),
+                         indent=2))
+    summary = precompute(args.alloc_path, args.output, args.workers, args.materialize,
+                         args.report_compact_memory)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import ast
+import re
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def row_field_names(columns):
+    # Mesmos nomes que DataFrame.itertuples() gera (ex.: 'Unnamed: 0' -> '_1'),
+    # para que o plano mantenha as colunas que o dashboard sempre viu.
+    return list(namedtuple('Pandas', ['Index', *map(str, columns)], rename=True)._fields[1:])
+
+
+def quota_column(df_alloc, col, default):
+    if col in df_alloc.columns:
+        return df_alloc[col].to_numpy()
+    return np.full(len(df_alloc), default)
+
+
+def delivery_days(df_alloc):
+    """Dias de entrega por cota: ausente, NaN ou < 1 vira 1; demais são truncados."""
+    days = pd.Series(quota_column(df_alloc, 'DaystoDeliver', 1.0), dtype='float64')
+    days = days.where(days.notna() & (days >= 1), 1.0)
+    return days.to_numpy().astype(np.int64)
+
+
+def split_evenly(totals, days, offsets, quota_pos):
+    """Meta do dia `offsets` para cada cota: base = total // dias, +1 nos primeiros `resto` dias."""
+    base = totals // days
+    remainder = totals % days
+    return base[quota_pos] + (offsets < remainder[quota_pos])
+
+
+def expand_plan(df_alloc, today=None, window=None):
+    """Expande cada cota em uma linha por dia de entrega, sem laço em Python.
+
+    Equivalente à expansão original com itertuples(): mesmas colunas, mesma
+    ordem de linhas e mesma divisão base + resto entre os dias. `window`
+    (dia inicial, dia final, relativos a hoje) gera só as linhas desse
+    intervalo: o recorte é calculado por cota, sem comparar datas linha a linha.
+    """
+    if today is None:
+        today = date.today()
+    if df_alloc.empty:
+        return pd.DataFrame()
+
+    days = delivery_days(df_alloc)
+    totals = quota_column(df_alloc, 'Pessoas_Para_Recrutar', 0)
+    allocated = quota_column(df_alloc, 'allocated_completes', 0)
+
+    first = np.zeros(len(days), dtype=np.int64)
+    counts = days
+    if window is not None:
+        lo, hi = window
+        first = np.full(len(days), max(lo, 0), dtype=np.int64)
+        counts = np.clip(np.minimum(hi, days - 1) - first + 1, 0, None)
+    quota_pos = np.repeat(np.arange(len(df_alloc)), counts)
+    starts = np.cumsum(counts) - counts
+    offsets = np.arange(len(quota_pos)) - starts[quota_pos] + first[quota_pos]
+
+    daily_goal = split_evenly(totals, days, offsets, quota_pos)
+    daily_allocated = split_evenly(allocated, days, offsets, quota_pos)
+    keep = (daily_goal > 0) | (daily_allocated > 0)
+    if not keep.any():
+        return pd.DataFrame()
+
+    quota_pos, offsets = quota_pos[keep], offsets[keep]
+    df_plan = df_alloc.take(quota_pos).reset_index(drop=True)
+    df_plan.columns = row_field_names(df_alloc.columns)
+    plan_dates = np.datetime64(today, 'D') + offsets
+    df_plan['plan_date'] = pd.Series(plan_dates).dt.date
+    df_plan['daily_recruitment_goal'] = daily_goal[keep]
+    df_plan['daily_allocated_goal'] = daily_allocated[keep]
+    df_plan['original_quota_index'] = df_alloc.index.to_numpy()[quota_pos]
+    return df_plan
+
+
+_LIST_ITEM = re.compile(r"\s*(?:'([^'\\]*)'|\"([^\"\\]*)\"|([-+]?(?:0|[1-9]\d*)))\s*(,|$)")
+QUOTA_PLACEHOLDERS = {'Region': 'Any Region', 'SEL': 'Country without SEL'}
+
+
+def parse_quota_literal(text):
+    """Lê literais como "['age_group', 'Gender']" sem ast; formatos incomuns caem no literal_eval."""
+    if isinstance(text, str):
+        inner = text.strip()
+        if inner.startswith('[') and inner.endswith(']'):
+            inner = inner[1:-1]
+            items, pos = [], 0
+            while pos < len(inner):
+                match = _LIST_ITEM.match(inner, pos)
+                if match is None or (match.group(4) == ',' and match.end() == len(inner)):
+                    break
+                single, double, number = match.group(1, 2, 3)
+                items.append(int(number) if number is not None else single if single is not None else double)
+                pos = match.end()
+            else:
+                return items
+    return ast.literal_eval(text)
+
+
+def parse_quota_definition(cotas, resultado_cota, _memo=None):
+    memo = {} if _memo is None else _memo
+    try:
+        if cotas not in memo:
+            memo[cotas] = parse_quota_literal(cotas)
+        if resultado_cota not in memo:
+            memo[resultado_cota] = parse_quota_literal(resultado_cota)
+        keys, values = memo[cotas], memo[resultado_cota]
+        if isinstance(keys, (list, tuple)) and len(keys) == len(values):
+            return dict(zip(keys, values))
+    except Exception:
+        return {}
+    return {}
+
+
+def parse_quota_definitions(df_alloc, quota_index=None):
+    """Decodifica `cotas`/`resultado_cota` uma única vez por cota em colunas (age_group, Gender, ...).
+
+    Pares de strings idênticos são decodificados uma vez só. O resultado é
+    indexado pelo índice da cota, pronto para ser juntado ao plano por
+    `original_quota_index`.
+    """
+    if quota_index is None:
+        quota_index = df_alloc.index
+    quotas = df_alloc.loc[quota_index, ['cotas', 'resultado_cota']]
+    memo, definitions = {}, {}
+    records = []
+    for pair in zip(quotas['cotas'], quotas['resultado_cota']):
+        if pair not in definitions:
+            definitions[pair] = parse_quota_definition(*pair, _memo=memo)
+        records.append(definitions[pair])
+    df_quota_dims = pd.DataFrame(records, index=pd.Index(quota_index, name='original_quota_index'))
+    return normalize_placeholders(df_quota_dims)
+
+
+def normalize_placeholders(df):
+    """Region/SEL como texto, com 0 trocado pelo rótulo de 'qualquer'. Pode ser reaplicado sem efeito."""
+    for col, replacement in QUOTA_PLACEHOLDERS.items():
+        if col in df.columns:
+            df[col] = df[col].astype(str).replace('0', replacement)
+    return df
+
+
+def attach_quota_dims(df_plan, df_quota_dims):
+    positions = df_quota_dims.index.get_indexer(df_plan['original_quota_index'])
+    dims = df_quota_dims.take(positions).reset_index(drop=True)
+    dims.index = df_plan.index
+    return pd.concat([df_plan, dims], axis=1)
+
+
+def build_plan(df_alloc, today=None, compact=False):
+    """Plano diário completo: expansão por dia + dimensões das cotas + project_id como texto.
+
+    Com `compact=True` o resultado passa por compact_plan().
+    """
+    df_plan = expand_plan(df_alloc, today)
+    if df_plan.empty:
+        return df_plan
+    quota_index = pd.unique(df_plan['original_quota_index'])
+    df_plan = attach_quota_dims(df_plan, parse_quota_definitions(df_alloc, quota_index))
+    df_plan['project_id'] = df_plan['project_id'].astype(str)
+    return compact_plan(df_plan) if compact else df_plan
+
+
+CATEGORICAL_MAX_RATIO = 0.5
+ALWAYS_CATEGORICAL = ['project_id', *QUOTA_PLACEHOLDERS]
+
+
+def _is_integral(values):
+    return values.notna().all() and (values == np.floor(values)).all()
+
+
+def compact_column(values, max_ratio=CATEGORICAL_MAX_RATIO, categorical=False):
+    """Menor representação equivalente de uma coluna do plano."""
+    if values.name == 'plan_date':
+        # O pandas não tem datetime64[D]; segundos é a menor resolução suportada.
+        return pd.to_datetime(values).astype('datetime64[s]')
+    if pd.api.types.is_bool_dtype(values) or isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    if pd.api.types.is_integer_dtype(values) or (pd.api.types.is_float_dtype(values) and _is_integral(values)):
+        return pd.to_numeric(values, downcast='integer') if len(values) else values
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if categorical or values.nunique(dropna=False) <= max_ratio * len(values):
+        return values.astype('category')
+    return values
+
+
+def compact_plan(df_plan, max_ratio=CATEGORICAL_MAX_RATIO):
+    """Esquema compacto do plano: datas em datetime64, inteiros no menor tipo e
+    dimensões (e project_id) como categorias quando têm poucos valores distintos.
+    """
+    return pd.DataFrame({
+        col: compact_column(df_plan[col], max_ratio, col in ALWAYS_CATEGORICAL) for col in df_plan.columns
+    }, index=df_plan.index)
+
+
+def memory_report(df, baseline=None):
+    """Bytes por coluna (contando objetos Python) e total; com `baseline`, compara com outro frame."""
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': df.memory_usage(deep=True, index=False)})
+    if baseline is not None:
+        report['dtype_before'] = baseline.dtypes.astype(str)
+        report['bytes_before'] = baseline.memory_usage(deep=True, index=False)
+    report.loc['(total)'] = report.sum(numeric_only=True)
+    report = report.astype({col: 'int64' for col in ['bytes', 'bytes_before'] if col in report})
+    if baseline is not None:
+        report['ratio'] = (report['bytes_before'] / report['bytes']).round(1)
+    report.index.name = 'column'
+    return report
@@ -0,0 +1,154 @@
+"""Store único por processo com as tabelas e o plano que todas as sessões leem.
+
+As tabelas de entrada são abertas do cache Arrow com `zero_copy=True`: as
+colunas numéricas são visões somente leitura sobre o memory-map, e nenhuma
+sessão recebe uma cópia. Escrever nelas no lugar (df.loc[...] = ... ou no
+array de to_numpy()) levanta `ValueError: assignment destination is
+read-only`; para mudar uma coluna, troque-a inteira com assign() ou use uma
+cópia. O plano (IntervalPlan) e o cubo são objetos pandas/numpy comuns,
+montados na carga e compartilhados por todas as sessões sem proteção contra
+escrita: as sessões só os leem e filtram com máscaras. O dashboard guarda o
+StoreWatcher em st.cache_resource, então um rerun só pega a referência do
+snapshot atual (sem pickle/unpickle).
+
+Quando os arquivos de entrada mudam, o StoreWatcher monta um novo PlanStore
+numa thread e troca o snapshot de uma vez; os reruns nunca esperam a carga.
+O tempo de cada etapa da carga fica em `load_timings`, no formato dos
+registros do perf.Recorder.
+"""
+import os
+import threading
+from datetime import datetime
+
+from data_cache import CACHE_DIR, file_signature, read_table
+from filter_index import FilterIndex
+import perf
+import pipeline
+
+POLL_SECONDS = 5
+
+
+def input_signatures(paths):
+    """Assinatura (tamanho, mtime) de cada arquivo; None para os que não existem."""
+    signatures = {}
+    for path in paths:
+        try:
+            signatures[path] = file_signature(path)
+        except OSError:
+            signatures[path] = None
+    return signatures
+
+
+class PlanStore:
+
+    def __init__(self, alloc_path, projects_path, report_path, filter_columns, cache_dir=CACHE_DIR, version=1):
+        self.paths = {'alloc': alloc_path, 'projects': projects_path, 'report': report_path}
+        # Lidas antes dos arquivos: uma mudança durante a carga ainda dispara outra reconstrução.
+        self.signatures = input_signatures(self.paths.values())
+        self.version = version
+        # Cada etapa da carga é medida uma vez por snapshot e exibida no painel Performance.
+        recorder = perf.Recorder(enabled=True, script='plan_store')
+        with recorder.span('read_alloc') as span:
+            self.df_alloc = read_table(alloc_path, cache_dir, zero_copy=True)
+            span.rows_out = len(self.df_alloc)
+        with recorder.span('read_projects') as span:
+            df_projects = read_table(projects_path, cache_dir, zero_copy=True)
+            # Troca a coluna inteira (não escreve no buffer compartilhado).
+            self.df_projects = df_projects.assign(project_id=df_projects['project_id'].astype(str))
+            span.rows_out = len(self.df_projects)
+        with recorder.span('read_report') as span:
+            self.df_report = read_table(report_path, cache_dir, zero_copy=True)
+            span.rows_out = len(self.df_report)
+        with recorder.span('load_plan', rows_in=len(self.df_alloc)) as span:
+            self.plan = pipeline.load_plan(self.df_alloc, compact=True)
+            span.rows_out = len(self.plan.quotas)
+        with recorder.span('load_cube', rows_in=len(self.plan.quotas)) as span:
+            self.cube = pipeline.load_cube(self.plan)
+            span.rows_out = len(self.cube.cells)
+        with recorder.span('filter_index', rows_in=len(self.cube.cells)):
+            self.filter_index = FilterIndex(self.cube.cells, filter_columns)
+        self.load_timings = recorder.records
+        self.loaded_at = datetime.now().astimezone()
+
+    def source_modified_at(self):
+        """Data de modificação mais recente entre os arquivos de entrada."""
+        mtime_ns = max(signature['mtime_ns'] for signature in self.signatures.values())
+        return datetime.fromtimestamp(mtime_ns / 1e9).astimezone()
+
+
+class StoreWatcher:
+    """Mantém o PlanStore atual e o reconstrói numa thread quando os arquivos mudam.
+
+    O primeiro snapshot é carregado no construtor; os seguintes são montados
+    por completo na thread e só então publicados com uma única atribuição,
+    então quem lê `snapshot` nunca vê um store pela metade nem espera a carga.
+    Uma mudança só é processada depois de a assinatura dos arquivos se repetir
+    em duas verificações seguidas (arquivo terminou de ser gravado).
+    """
+
+    def __init__(self, alloc_path, projects_path, report_path, filter_columns, poll_seconds=POLL_SECONDS):
+        self.args = (alloc_path, projects_path, report_path, filter_columns)
+        self.poll_seconds = poll_seconds
+        self.snapshot = None
+        self.error = None
+        self._failed = None
+        self._stop = threading.Event()
+        self._rebuild(input_signatures(self.args[:3]))
+        self._thread = threading.Thread(target=self._run, name='plan-store-watcher', daemon=True)
+        self._thread.start()
+
+    def _rebuild(self, signatures):
+        if missing_files(*self.args[:3]):
+            self.error = "Um ou mais arquivos de dados não foram encontrados. Verifique os caminhos."
+            return
+        version = self.snapshot.version + 1 if self.snapshot is not None else 1
+        try:
+            store = PlanStore(*self.args, version=version)
+        except Exception as exc:
+            # Mantém o snapshot anterior; a mesma versão dos arquivos não é tentada de novo.
+            self.error = f"Falha ao recarregar os dados: {exc}"
+            self._failed = signatures
+            return
+        self.snapshot, self.error, self._failed = store, None, None
+
+    def _poll(self, previous):
+        # Uma verificação: reconstrói se a assinatura se repetiu desde `previous` e ainda não foi
+        # carregada nem falhou. Devolve a assinatura atual para a próxima verificação.
+        current = input_signatures(self.args[:3])
+        loaded = self.snapshot.signatures if self.snapshot is not None else None
+        if current == previous and current != loaded and current != self._failed:
+            self._rebuild(current)
+        return current
+
+    def _run(self):
+        previous = None
+        while not self._stop.wait(self.poll_seconds):
+            previous = self._poll(previous)
+
+    def stop(self, wait=True):
+        """Encerra a thread; com `wait=False` não espera uma reconstrução em andamento terminar."""
+        self._stop.set()
+        if wait:
+            self._thread.join()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def replace_watcher(*args, **kwargs):
+    """Cria o StoreWatcher do processo e para o criado antes por esta função.
+
+    O st.cache_resource do dashboard pode ser limpo; sem isso o watcher antigo
+    continuaria reconstruindo stores que ninguém lê.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            _watcher.stop(wait=False)
+        _watcher = StoreWatcher(*args, **kwargs)
+        return _watcher
+
+
+def missing_files(*paths):
+    return [path for path in paths if not os.path.exists(path)]
@@ -0,0 +1,179 @@
+"""Busca por palavras-chave nas linhas do relatório de recrutamento.
+
+Não é busca semântica: cada linha do Report vira um documento no mesmo
+formato do docstore em faiss_index/index.pkl ("country: AR\\nExpected Date: ...")
+e é convertida num vetor das suas palavras e trigramas de caracteres: cada
+termo soma ±1 numa das EMBEDDING_DIM posições escolhida por hashing, e o
+vetor é normalizado.
+A similaridade por cosseno premia linhas que compartilham termos (ou pedaços
+de termos, o que tolera grafias parecidas) com a consulta; sinônimos e
+termos relacionados não são reconhecidos. Os vetores ficam em
+SEARCH_INDEX_DIR como uma matriz float32 aberta via memory-map, ao lado de um
+docstore compacto em Arrow (id da linha -> linha do relatório + hash do
+documento). Abrir o índice não desserializa nenhum pickle, e a reconstrução só
+gera vetores para linhas novas ou alteradas.
+
+    python report_search.py Report.xlsx
+    python report_search.py Report.xlsx --query "AR female 18to19 Centro"
+"""
+import argparse
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data_cache import read_arrow, read_table, write_arrow, write_atomic, write_json_atomic
+
+SEARCH_INDEX_DIR = 'faiss_index'
+EMBEDDING_MODEL = 'hashing-word-trigram-v1'
+EMBEDDING_DIM = 256
+ROW_ID_COLUMN = 'Unnamed: 0'
+_TOKEN = re.compile(r'[0-9a-zà-ÿ]+')
+
+
+def _paths(directory):
+    return {
+        'vectors': os.path.join(directory, 'report_vectors.npy'),
+        'docstore': os.path.join(directory, 'report_docstore.arrow'),
+        'meta': os.path.join(directory, 'report_meta.json'),
+    }
+
+
+def document_texts(df_report):
+    """Texto de cada linha, no formato "coluna: valor" usado no docstore original."""
+    texts = None
+    for col in df_report.columns:
+        if col == ROW_ID_COLUMN:
+            continue
+        values = df_report[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime('%Y-%m-%d')
+        # Ausentes viram texto vazio antes do astype(str), senão seriam indexados como 'nan'/'None'.
+        part = f'{col}: ' + values.astype(object).where(values.notna(), '').astype(str)
+        texts = part if texts is None else texts + '\n' + part
+    if texts is None:
+        return pd.Series([''] * len(df_report), index=df_report.index)
+    return texts
+
+
+def _features(text):
+    words = _TOKEN.findall(text.lower())
+    return words + [f'#{word[i:i + 3]}' for word in words if len(word) > 3 for i in range(len(word) - 2)]
+
+
+def embed(texts, dim=EMBEDDING_DIM):
+    """Vetores unitários por hashing com sinal das palavras e de seus trigramas."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        hashes = np.fromiter((zlib.crc32(feature.encode()) for feature in _features(text)), dtype=np.int64)
+        if len(hashes):
+            np.add.at(vectors[i], hashes % dim, np.where(hashes & (1 << 31), -1.0, 1.0))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _document_hashes(texts):
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy()
+
+
+class ReportIndex:
+    """Índice aberto de SEARCH_INDEX_DIR: vetores via memory-map e docstore em Arrow."""
+
+    def __init__(self, directory=SEARCH_INDEX_DIR):
+        paths = _paths(directory)
+        with open(paths['meta']) as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(paths['vectors'], mmap_mode='r')
+        self.docstore = read_arrow(paths['docstore'])
+        self.row_ids = self.docstore['row_id'].to_numpy()
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def search(self, query, k=10):
+        """Linhas do relatório (posições) e similaridades das `k` mais próximas de `query`."""
+        if not len(self) or not query.strip():
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        scores = self.vectors @ embed([query], self.meta['dim'])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return self.row_ids[top], scores[top]
+
+
+def _save_vectors(path, vectors):
+    with open(path, 'wb') as f:
+        np.save(f, vectors)
+
+
+def _previous(directory, dim):
+    try:
+        index = ReportIndex(directory)
+    except (OSError, ValueError, KeyError):
+        return None
+    if index.meta.get('model') != EMBEDDING_MODEL or index.meta.get('dim') != dim:
+        return None
+    return index
+
+
+def update_index(df_report, directory=SEARCH_INDEX_DIR, dim=EMBEDDING_DIM):
+    """Atualiza o índice de `directory` para `df_report` e devolve (ReportIndex, estatísticas).
+
+    Linhas cujo documento já estava indexado reaproveitam o vetor gravado;
+    apenas as novas ou alteradas passam pelo modelo.
+    """
+    texts = document_texts(df_report)
+    hashes = _document_hashes(texts)
+    previous = _previous(directory, dim)
+    stats = {'reused': 0, 'embedded': 0, 'dropped': 0}
+    if previous is not None and np.array_equal(previous.docstore['hash'].to_numpy(), hashes):
+        stats['reused'] = len(hashes)
+        return previous, stats
+
+    vectors = np.empty((len(hashes), dim), dtype=np.float32)
+    known = np.full(len(hashes), -1)
+    if previous is not None:
+        old_hashes = pd.Index(previous.docstore['hash'].to_numpy())
+        first = ~old_hashes.duplicated()
+        known = old_hashes[first].get_indexer(hashes)
+        known = np.where(known >= 0, np.flatnonzero(first)[known], -1)
+        reused = known >= 0
+        vectors[reused] = previous.vectors[known[reused]]
+        stats['dropped'] = int((~old_hashes.isin(hashes)).sum())
+    new = np.flatnonzero(known < 0)
+    vectors[new] = embed(texts.iloc[new].tolist(), dim)
+    stats['reused'], stats['embedded'] = len(hashes) - len(new), len(new)
+
+    paths = _paths(directory)
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(paths['meta']):
+        os.remove(paths['meta'])
+    # O memory-map anterior ainda aponta para o arquivo antigo; substituir por rename não o afeta.
+    write_atomic(paths['vectors'], lambda tmp_path: _save_vectors(tmp_path, vectors))
+    write_arrow(pd.DataFrame({'row_id': np.arange(len(hashes)), 'hash': hashes}), paths['docstore'])
+    meta = {'model': EMBEDDING_MODEL, 'dim': dim, 'rows': len(hashes)}
+    write_json_atomic(paths['meta'], meta)
+    return ReportIndex(directory), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cria/atualiza o índice de busca do relatório.")
+    parser.add_argument('report_path', nargs='?', default='Report.xlsx')
+    parser.add_argument('--output', default=SEARCH_INDEX_DIR)
+    parser.add_argument('--query', help="consulta a executar depois da atualização")
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args(argv)
+    df_report = read_table(args.report_path)
+    index, stats = update_index(df_report, args.output)
+    print(json.dumps(stats))
+    if args.query:
+        rows, scores = index.search(args.query, args.k)
+        print(df_report.iloc[rows].assign(score=scores).to_string())
+
+
+if __name__ == '__main__':
+    main()
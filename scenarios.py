@@ -0,0 +1,183 @@
+"""Cenários "e se" sobre o plano: prazos, início e forma da divisão diária.
+
+Um cenário é um dict com sobrescritas sobre a alocação base:
+
+    {'name': 'Prazo +7 dias', 'delay_days': 7}
+    {'name': 'Antecipado', 'split': 'front', 'front_share': 0.7}
+    {'name': 'P1 em 10 dias', 'days_to_deliver': {'100001': 10}, 'start_offset': {'100001': 3}}
+
+`delay_days` e `start_offset` aceitam um número (todas as cotas) ou um dict
+project_id -> dias; `days_to_deliver` troca o prazo dos projetos indicados.
+As chaves project_id podem ser texto ou número (comparadas como texto).
+`split='even'` é a divisão base + resto de hoje; `split='front'` coloca
+`front_share` do total na primeira metade do prazo (cada metade dividida por
+base + resto). As metas diárias são constantes por trechos, então cada cenário
+vira eventos de diferença e um bincount, sem gerar o plano linha a linha.
+
+A tabela de cotas é montada uma vez e enviada a cada processo do pool uma
+única vez (initializer); as tarefas só carregam os parâmetros do cenário.
+
+    python scenarios.py GeminiCheck.csv --presets --workers 4
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_cache import read_table
+from lazy_plan import IntervalPlan
+
+SCENARIO_PRESETS = {
+    'Base': {},
+    'Prazo +7 dias': {'delay_days': 7},
+    'Prazo -7 dias': {'delay_days': -7},
+    'Início +7 dias': {'start_offset': 7},
+    'Antecipado (70% na 1ª metade)': {'split': 'front', 'front_share': 0.7},
+}
+PERIODS = {'next_7_days': 7, 'next_30_days': 30}
+_TABLE = None
+
+
+def scenario_table(plan, quota_mask=None):
+    """Arrays das cotas ativas do plano (ou de `quota_mask`) que os cenários precisam."""
+    keep = np.ones(len(plan.quotas), dtype=bool) if quota_mask is None else np.asarray(quota_mask)
+    quotas = plan.quotas[keep]
+    project_codes, projects = pd.factorize(quotas['project_id'].astype(str))
+    country = quotas['country'] if 'country' in quotas else pd.Series([''] * len(quotas))
+    country_codes, countries = pd.factorize(country, use_na_sentinel=False)
+    return {
+        'days': plan.days[keep],
+        'goals': {col: np.nan_to_num(totals[keep]).astype(np.int64) for col, totals in plan.goals.items()},
+        'project': project_codes,
+        'projects': list(projects),
+        'country': country_codes,
+        'countries': [str(country) for country in countries],
+    }
+
+
+def _by_project(value):
+    # project_id é texto na tabela; {100001: 10} e {'100001': 10} são o mesmo cenário.
+    return {str(project): days for project, days in value.items()}
+
+
+def _per_quota(table, value, default=0):
+    # Número para todas as cotas ou dict project_id -> valor (demais ficam com `default`).
+    if not isinstance(value, dict):
+        return np.full(len(table['days']), value if value is not None else default, dtype=np.int64)
+    value = _by_project(value)
+    by_project = np.array([value.get(project, default) for project in table['projects']], dtype=np.int64)
+    return by_project[table['project']] if len(by_project) else np.zeros(0, dtype=np.int64)
+
+
+def _scenario_days(table, scenario):
+    days = table['days'].astype(np.int64)
+    overrides = _by_project(scenario.get('days_to_deliver') or {})
+    if overrides:
+        replaced = np.array([project in overrides for project in table['projects']], dtype=bool)[table['project']]
+        days = np.where(replaced, _per_quota(table, overrides, 1), days)
+    days = days + _per_quota(table, scenario.get('delay_days'))
+    return np.maximum(days, 1)
+
+
+def _even_events(totals, days, start, quota_pos):
+    # Base + 1 de start até start + resto - 1, base até start + dias - 1 (o cenário projeta a cota inteira,
+    # sem o corte nos dias sem linha do plano que o _split_events do cubo faz).
+    base, remainder = totals // days, totals % days
+    event_days = np.concatenate([start, start + remainder, start + days])
+    deltas = np.concatenate([base + (remainder > 0), -(remainder > 0).astype(np.int64), -base])
+    return event_days, deltas, np.tile(quota_pos, 3)
+
+
+def _front_events(totals, days, start, share):
+    first_days = np.where(days > 1, (days + 1) // 2, days)
+    first_total = np.where(days > 1, np.floor(totals * share + 0.5).astype(np.int64), totals)
+    head = _even_events(first_total, first_days, start, np.arange(len(days)))
+    rest = np.flatnonzero(days > first_days)
+    tail = _even_events((totals - first_total)[rest], (days - first_days)[rest], (start + first_days)[rest], rest)
+    return tuple(np.concatenate(parts) for parts in zip(head, tail))
+
+
+def evaluate_scenario(table, scenario):
+    """Séries diárias (por país) de cada meta no cenário; dia 0 = hoje."""
+    days = _scenario_days(table, scenario)
+    start = np.maximum(_per_quota(table, scenario.get('start_offset')), 0)
+    horizon = int((start + days).max()) if len(days) else 0
+    n_countries = max(len(table['countries']), 1)
+    series = {}
+    for col, totals in table['goals'].items():
+        if scenario.get('split', 'even') == 'front':
+            event_days, deltas, quota_pos = _front_events(totals, days, start, scenario.get('front_share', 0.7))
+        else:
+            event_days, deltas, quota_pos = _even_events(totals, days, start, np.arange(len(days)))
+        keys = table['country'][quota_pos] * (horizon + 1) + event_days
+        flat = np.bincount(keys, weights=deltas, minlength=n_countries * (horizon + 1))
+        series[col] = np.cumsum(flat.reshape(n_countries, horizon + 1), axis=1)[:, :horizon].round().astype(np.int64)
+    return {'name': scenario.get('name', ''), 'series': series, 'last_day': horizon - 1}
+
+
+def _init_worker(table):
+    global _TABLE
+    _TABLE = table
+
+
+def _evaluate_in_worker(scenario):
+    return evaluate_scenario(_TABLE, scenario)
+
+
+def evaluate_scenarios(table, scenarios, workers=None):
+    """Avalia todos os `scenarios`; com mais de um worker, num pool que recebe `table` uma vez só."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(scenarios) <= 1:
+        return [evaluate_scenario(table, scenario) for scenario in scenarios]
+    with ProcessPoolExecutor(max_workers=min(workers, len(scenarios)), initializer=_init_worker,
+                             initargs=(table,)) as pool:
+        return list(pool.map(_evaluate_in_worker, scenarios, chunksize=max(1, len(scenarios) // (4 * workers))))
+
+
+def summarize(results, measure='daily_recruitment_goal'):
+    """Uma linha por cenário com agregados comparáveis (totais por período, pico e término)."""
+    rows = []
+    for result in results:
+        daily = result['series'][measure].sum(axis=0)
+        row = {'scenario': result['name'], 'total': int(daily.sum())}
+        for name, n_days in PERIODS.items():
+            row[name] = int(daily[:n_days].sum())
+        row['peak_day_goal'] = int(daily.max()) if len(daily) else 0
+        row['peak_day'] = int(daily.argmax()) if len(daily) else 0
+        row['last_day'] = result['last_day']
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def daily_frame(results, measure='daily_recruitment_goal'):
+    """Meta diária total de cada cenário em colunas, indexada pelo dia (0 = hoje)."""
+    horizon = max((result['series'][measure].shape[1] for result in results), default=0)
+    return pd.DataFrame({
+        result['name']: np.pad(result['series'][measure].sum(axis=0), (0, horizon - result['series'][measure].shape[1]))
+        for result in results
+    }, index=pd.RangeIndex(horizon, name='day'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avalia cenários 'e se' sobre o plano de recrutamento.")
+    parser.add_argument('alloc_path', nargs='?', default='GeminiCheck.csv')
+    parser.add_argument('--scenarios', help="arquivo JSON com uma lista de cenários")
+    parser.add_argument('--presets', action='store_true', help="inclui os cenários predefinidos")
+    parser.add_argument('--workers', type=int, help="processos no pool (padrão: todos os núcleos)")
+    args = parser.parse_args(argv)
+
+    scenarios = [{'name': name, **params} for name, params in SCENARIO_PRESETS.items()] if args.presets else []
+    if args.scenarios:
+        with open(args.scenarios) as f:
+            scenarios += json.load(f)
+    if not scenarios:
+        parser.error("informe --scenarios e/ou --presets")
+    table = scenario_table(IntervalPlan(read_table(args.alloc_path)))
+    print(summarize(evaluate_scenarios(table, scenarios, args.workers)).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""run_batch() comparado ao cubo do dashboard, com linhas inválidas e rótulos numéricos."""
+import json
+
+import pandas as pd
+import pytest
+
+from batch_queries import run_batch
+from demand_cube import DemandCube
+from filter_index import FilterIndex
+from lazy_plan import IntervalPlan
+from tests.test_plan_engine import TODAY, alloc_frame
+
+
+def numeric_age_alloc():
+    # age_group numérico com cotas sem a dimensão: a coluna vira float (3.0, 4.0, NaN).
+    return alloc_frame(cotas=["['age_group', 'Gender']", "['Gender']", "['age_group']", "['age_group']",
+                              "['Gender', 'SEL']", "['Gender']"],
+                       resultado_cota=["[3, 'Male']", "['Male']", "[4]", "[3]", "['Female', 'A']", "['Male']"],
+                       DaystoDeliver=5.0)
+
+
+def cube_and_index(df_alloc):
+    cube = DemandCube(IntervalPlan(df_alloc, TODAY))
+    return cube, FilterIndex(cube.cells, cube.dimensions)
+
+
+def test_invalid_lines_do_not_stop_the_batch():
+    cube, index = cube_and_index(alloc_frame())
+    queries = [
+        '{"id": "ok"}',
+        '{bad json',
+        '["not", "an", "object"]',
+        json.dumps({'id': 'col', 'filters': {'nope': ['x']}}),
+        json.dumps({'id': 'value', 'filters': {'country': ['MX']}}),
+        json.dumps({'id': 'dates', 'start': '2025-01-09', 'end': '2025-01-07'}),
+        json.dumps({'id': 'breakdown', 'breakdowns': ['nope']}),
+        json.dumps({'id': 'measure', 'measure': 'nope'}),
+        json.dumps({'id': 'date', 'start': 'amanhã'}),
+    ]
+    results = run_batch(queries, cube, index)
+    assert [result['id'] for result in results] == ['ok', 1, 2, 'col', 'value', 'dates', 'breakdown', 'measure', 'date']
+    assert 'totals' in results[0]
+    assert all(set(result) == {'id', 'error'} for result in results[1:])
+    assert 'MX' in results[4]['error']
+
+
+@pytest.mark.parametrize('value', [3, 3.0, '3', [3, '3'], ['3', 3.0]])
+def test_numeric_labels_resolve_to_the_column_value(value):
+    cube, index = cube_and_index(numeric_age_alloc())
+    assert cube.cells['age_group'].dtype == 'float64'
+    [result] = run_batch([{'filters': {'age_group': value}, 'breakdowns': ['age_group']}], cube, index)
+    expected = cube.totals(cell_mask=index.select('age_group', [3.0]))
+    assert result['totals'] == {col: pytest.approx(value) for col, value in expected.items()}
+    assert list(result['breakdowns']['age_group']) == ['3.0']
+
+
+def test_matches_dashboard_cube():
+    df_alloc = alloc_frame(DaystoDeliver=[10.0, 4.0, 2.0, 4.0, 3.0, 6.0])
+    cube, index = cube_and_index(df_alloc)
+    query = {'id': 'q', 'start': '2025-01-07', 'end': '2025-01-09', 'filters': {'country': ['AR', 'CL']},
+             'breakdowns': ['country', 'Gender'], 'measure': 'daily_allocated_goal'}
+    result, repeated = run_batch([query, query], cube, index)
+    assert repeated == result
+    start, end = pd.Timestamp('2025-01-07').date(), pd.Timestamp('2025-01-09').date()
+    mask = index.select('country', ['AR', 'CL'])
+    assert result['totals'] == pytest.approx(cube.totals(start, end, cell_mask=mask))
+    for col in query['breakdowns']:
+        breakdown = cube.breakdown(col, start, end, cell_mask=mask, measure=query['measure'])
+        assert list(result['breakdowns'][col].items()) == list(zip(map(str, breakdown.index), breakdown.tolist()))
+
+
+def test_empty_plan():
+    cube, index = cube_and_index(alloc_frame(Pessoas_Para_Recrutar=0, allocated_completes=0))
+    results = run_batch([{'id': 'all', 'breakdowns': ['country']},
+                         {'id': 'week', 'start': '2025-01-06', 'end': '2025-01-12'}], cube, index)
+    zero = {'daily_recruitment_goal': 0, 'daily_allocated_goal': 0, 'plan_rows': 0, 'allocated_completes': 0}
+    assert results == [{'id': 'all', 'totals': zero, 'breakdowns': {'country': {}}},
+                       {'id': 'week', 'totals': zero, 'breakdowns': {}}]
@@ -0,0 +1,67 @@
+"""Cache colunar: mesma leitura a frio e a quente e invalidação por tamanho, mtime e hash."""
+import os
+
+import pandas as pd
+
+from data_cache import _cache_paths, is_cached, read_table, warm_cache
+
+CSV = "project_id,Recruitment,Pessoas_Para_Recrutar\n100001,Yes,10\n100002,,20\n100003,No,\n"
+
+
+def _write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _arrow_mtime(path, cache_dir):
+    return os.stat(_cache_paths(str(path), cache_dir)[0]).st_mtime_ns
+
+
+def test_cold_read_matches_warm_read(tmp_path):
+    source = tmp_path / 'alloc.csv'
+    _write(source, CSV)
+    cache_dir = str(tmp_path / 'cache')
+    cold = read_table(str(source), cache_dir)
+    warm = read_table(str(source), cache_dir)
+    pd.testing.assert_frame_equal(cold, warm)
+    assert cold['Recruitment'].isna().sum() == 1
+
+
+def test_invalidation(tmp_path):
+    source = tmp_path / 'alloc.csv'
+    cache_dir = str(tmp_path / 'cache')
+    _write(source, CSV, mtime_ns=1_000_000_000)
+    read_table(str(source), cache_dir)
+    converted = _arrow_mtime(source, cache_dir)
+
+    # Só o mtime mudou: o hash confere e o arquivo colunar é reaproveitado.
+    _write(source, CSV, mtime_ns=2_000_000_000)
+    assert not is_cached(str(source), cache_dir)
+    read_table(str(source), cache_dir)
+    assert is_cached(str(source), cache_dir)
+    assert _arrow_mtime(source, cache_dir) == converted
+
+    # Mesmo tamanho e mtime com outro conteúdo: a assinatura confere e o hash nem é calculado.
+    _write(source, CSV.replace('Yes', 'Yup'), mtime_ns=2_000_000_000)
+    assert read_table(str(source), cache_dir)['Recruitment'].iloc[0] == 'Yes'
+
+    # Mesmo tamanho, mtime novo e conteúdo diferente: o hash diverge e a fonte é convertida de novo.
+    _write(source, CSV.replace('Yes', 'Yup'), mtime_ns=3_000_000_000)
+    assert read_table(str(source), cache_dir)['Recruitment'].iloc[0] == 'Yup'
+
+    # Tamanho diferente.
+    _write(source, CSV + "100004,Yes,40\n", mtime_ns=3_000_000_000)
+    assert len(read_table(str(source), cache_dir)) == 4
+    assert is_cached(str(source), cache_dir)
+
+
+def test_warm_cache_reports_uncached_files(tmp_path, caplog):
+    good = tmp_path / 'alloc.csv'
+    _write(good, CSV)
+    mixed = tmp_path / 'mixed.xlsx'
+    pd.DataFrame({'Status': [1, 'a', 2.5]}).to_excel(mixed, index=False)
+    cache_dir = str(tmp_path / 'cache')
+    status = warm_cache([str(good), str(mixed)], cache_dir)
+    assert status == {str(good): {'rows': 3, 'cached': True}, str(mixed): {'rows': 3, 'cached': False}}
+    assert 'mixed.xlsx' in caplog.text
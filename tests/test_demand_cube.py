@@ -0,0 +1,82 @@
+"""DemandCube comparado às somas e quebras do dashboard sobre as linhas do build_plan()."""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_alloc
+from demand_cube import MEASURES, DemandCube
+from filter_index import FilterIndex
+from lazy_plan import IntervalPlan
+from tests.test_lazy_plan import ALLOCS, PERIODS, plan_in_period
+from tests.test_plan_engine import TODAY
+
+
+def synthetic_alloc():
+    df_alloc = generate_alloc(300, seed=7)
+    # Metas negativas e ausentes nas mesmas cotas que outras metas positivas.
+    df_alloc['Pessoas_Para_Recrutar'] = df_alloc['Pessoas_Para_Recrutar'].astype('float64')
+    df_alloc.loc[::7, 'Pessoas_Para_Recrutar'] *= -1
+    df_alloc.loc[::11, 'Pessoas_Para_Recrutar'] = np.nan
+    df_alloc.loc[::13, 'allocated_completes'] *= -1
+    return df_alloc
+
+
+CASES = {**ALLOCS, 'synthetic': synthetic_alloc()}
+
+
+def dashboard_view(df_alloc, df_plan, countries=None):
+    # O que o dashboard calcula a partir das linhas do plano já filtradas.
+    if countries is not None:
+        df_plan = df_plan[df_plan['country'].isin(countries)]
+    quota_index = pd.unique(df_plan['original_quota_index']) if not df_plan.empty else []
+    totals = {
+        'daily_recruitment_goal': df_plan['daily_recruitment_goal'].sum() if not df_plan.empty else 0,
+        'daily_allocated_goal': df_plan['daily_allocated_goal'].sum() if not df_plan.empty else 0,
+        'plan_rows': len(df_plan),
+        'allocated_completes': df_alloc.loc[quota_index, 'allocated_completes'].sum(),
+    }
+    return totals, df_plan
+
+
+def expected_breakdown(df_plan, col, measure):
+    if measure == 'plan_rows':
+        grouped = df_plan.groupby(col).size()
+    else:
+        grouped = df_plan.groupby(col)[measure].sum()
+    return grouped.sort_values(ascending=False)
+
+
+@pytest.mark.parametrize('start,end', PERIODS)
+@pytest.mark.parametrize('countries', [None, ['AR'], ['AR', 'CL']])
+@pytest.mark.parametrize('name', CASES)
+def test_cube_matches_dashboard(name, countries, start, end):
+    df_alloc = CASES[name]
+    cube = DemandCube(IntervalPlan(df_alloc, TODAY))
+    cell_mask = None if countries is None else FilterIndex(cube.cells, cube.dimensions).select('country', countries)
+    df_plan = plan_in_period(df_alloc, start, end)
+    totals, df_view = dashboard_view(df_alloc, df_plan, countries)
+
+    actual = cube.totals(start, end, cell_mask=cell_mask)
+    assert actual == pytest.approx(totals)
+    if df_view.empty:
+        return
+    for col in cube.dimensions:
+        for measure in MEASURES:
+            breakdown = cube.breakdown(col, start, end, cell_mask=cell_mask, measure=measure)
+            expected = expected_breakdown(df_view, col, measure)
+            assert list(map(str, breakdown.index)) == list(map(str, expected.index)), (col, measure)
+            np.testing.assert_allclose(breakdown.to_numpy(dtype='float64'), expected.to_numpy(dtype='float64'))
+
+
+def test_breakdown_ties_keep_dashboard_order():
+    # Quatro países com a mesma meta: a ordem dos empates segue sort_values(ascending=False).
+    df_alloc = generate_alloc(40, n_projects=8, seed=3).assign(Pessoas_Para_Recrutar=30, DaystoDeliver=3.0)
+    cube = DemandCube(IntervalPlan(df_alloc, TODAY))
+    end = TODAY + timedelta(days=1)
+    expected = expected_breakdown(plan_in_period(df_alloc, None, end), 'country', 'daily_recruitment_goal')
+    assert expected.duplicated().any()
+    breakdown = cube.breakdown('country', None, end)
+    assert list(breakdown.index) == list(expected.index)
+    assert breakdown.tolist() == expected.tolist()
@@ -0,0 +1,62 @@
+"""Plano atualizado pelo snapshot em blocos comparado ao build_plan() da nova alocação."""
+import glob
+import os
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_alloc
+from incremental_plan import refresh_plan
+from plan_engine import build_plan
+
+TODAY = date(2025, 1, 6)
+
+
+def _mtimes(directory):
+    return {path: os.stat(path).st_mtime_ns for path in glob.glob(os.path.join(directory, 'plan-*.arrow'))}
+
+
+def changed_alloc(df_alloc):
+    df = df_alloc.copy()
+    df.loc[3, 'Pessoas_Para_Recrutar'] += 50
+    df = df.drop(index=[5, 6])
+    # Cota nova no topo (desloca as posições de todas as outras) com uma dimensão inédita.
+    new = df_alloc.iloc[[0]].assign(cotas="['Brand']", resultado_cota="['X']")
+    new.index = [len(df_alloc)]
+    return pd.concat([new, df])
+
+
+def test_update_matches_rebuild(tmp_path):
+    df_alloc = generate_alloc(400, seed=1)
+    df_plan, stats = refresh_plan(df_alloc, tmp_path, TODAY)
+    pd.testing.assert_frame_equal(df_plan, build_plan(df_alloc, TODAY))
+    assert stats['reused'] == 0
+
+    before = _mtimes(tmp_path)
+    df_changed = changed_alloc(df_alloc)
+    df_plan, stats = refresh_plan(df_changed, tmp_path, TODAY)
+    pd.testing.assert_frame_equal(df_plan, build_plan(df_changed, TODAY))
+    assert stats['rebuilt'] > 0 and stats['dropped'] > 0
+    assert stats['reused'] + stats['rebuilt'] == len(df_plan)
+
+    after = _mtimes(tmp_path)
+    rewritten = [path for path in after if before.get(path) != after[path]]
+    assert 0 < len(rewritten) <= stats['blocks_written'] < len(after)
+
+
+def test_unchanged_alloc_writes_nothing(tmp_path):
+    df_alloc = generate_alloc(200, seed=2)
+    refresh_plan(df_alloc, tmp_path, TODAY)
+    before = _mtimes(tmp_path)
+    df_plan, stats = refresh_plan(df_alloc, tmp_path, TODAY)
+    assert stats == {'reused': len(df_plan), 'rebuilt': 0, 'dropped': 0, 'saved': True, 'blocks_written': 0}
+    assert _mtimes(tmp_path) == before
+    pd.testing.assert_frame_equal(df_plan, build_plan(df_alloc, TODAY))
+
+
+def test_new_day_rebuilds(tmp_path):
+    df_alloc = generate_alloc(100, seed=3)
+    refresh_plan(df_alloc, tmp_path, TODAY)
+    df_plan, stats = refresh_plan(df_alloc, tmp_path, date(2025, 1, 7))
+    assert stats['reused'] == 0
+    pd.testing.assert_frame_equal(df_plan, build_plan(df_alloc, date(2025, 1, 7)))
@@ -0,0 +1,79 @@
+"""IntervalPlan comparado ao build_plan() filtrado pelas datas do período."""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lazy_plan import IntervalPlan
+from plan_engine import build_plan
+from tests.test_plan_engine import TODAY, alloc_frame
+
+PERIODS = [
+    (None, None),
+    (TODAY, TODAY),
+    (TODAY + timedelta(days=1), TODAY + timedelta(days=3)),
+    (TODAY - timedelta(days=5), TODAY + timedelta(days=1)),
+    (TODAY + timedelta(days=8), TODAY + timedelta(days=30)),
+]
+ALLOCS = {
+    'default': alloc_frame(),
+    'negative': alloc_frame(Pessoas_Para_Recrutar=[-5, 218, -30, 2, 0, -1],
+                            allocated_completes=[36, -42, 3, -9, 2, 1]),
+    'fractional': alloc_frame(Pessoas_Para_Recrutar=[2.5, 218.0, 0.4, 3.5, -0.5, 13.25],
+                              allocated_completes=[0.0, 1.5, 3.0, 9.0, 0.0, 2.0],
+                              DaystoDeliver=[10.0, 3.0, 2.0, 4.0, 3.0, 5.0]),
+    'nan': alloc_frame(Pessoas_Para_Recrutar=[291.0, np.nan, 7.0, -40.0, np.nan, 13.0],
+                       allocated_completes=[np.nan, 42.0, np.nan, 9.0, 0.0, 2.0]),
+}
+
+
+def plan_in_period(df_alloc, start, end):
+    df_plan = build_plan(df_alloc, TODAY)
+    if df_plan.empty:
+        return df_plan
+    keep = pd.Series(True, index=df_plan.index)
+    if start is not None:
+        keep &= df_plan['plan_date'] >= start
+    if end is not None:
+        keep &= df_plan['plan_date'] <= end
+    return df_plan[keep].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('start,end', PERIODS)
+@pytest.mark.parametrize('name', ALLOCS)
+def test_period_matches_daily_plan(name, start, end):
+    df_alloc = ALLOCS[name]
+    plan = IntervalPlan(df_alloc, TODAY)
+    expected = plan_in_period(df_alloc, start, end)
+    df_period = plan.period(start, end)
+    if expected.empty:
+        assert df_period.empty
+        return
+    grouped = expected.groupby('original_quota_index').agg(
+        daily_recruitment_goal=('daily_recruitment_goal', 'sum'),
+        daily_allocated_goal=('daily_allocated_goal', 'sum'),
+        plan_rows=('plan_date', 'size'))
+    actual = df_period.set_index('original_quota_index')[list(grouped.columns)]
+    pd.testing.assert_frame_equal(actual, grouped, check_dtype=False, check_names=False)
+
+    plan_rows = pd.Series(plan.plan_rows(start, end), index=plan.quotas.index)
+    assert plan_rows[plan_rows > 0].to_dict() == grouped['plan_rows'].to_dict()
+    assert len(plan) == len(build_plan(df_alloc, TODAY))
+
+
+@pytest.mark.parametrize('start,end', PERIODS)
+@pytest.mark.parametrize('name', ALLOCS)
+def test_materialize_matches_daily_plan(name, start, end):
+    df_alloc = ALLOCS[name]
+    expected = plan_in_period(df_alloc, start, end)
+    df_plan = IntervalPlan(df_alloc, TODAY).materialize(start, end)
+    if expected.empty:
+        assert df_plan.empty
+    else:
+        pd.testing.assert_frame_equal(df_plan, expected)
+
+
+def test_date_bounds_follow_last_plan_row():
+    df_alloc = ALLOCS['negative']
+    assert IntervalPlan(df_alloc, TODAY).date_bounds()[1] == build_plan(df_alloc, TODAY)['plan_date'].max()
@@ -0,0 +1,47 @@
+"""PartitionCube sobre as partições de alguns países comparado ao cubo do plano global filtrado."""
+import os
+from datetime import timedelta
+
+import pytest
+
+from batch_queries import run_batch
+from demand_cube import MEASURES, DemandCube
+from filter_index import FilterIndex
+from lazy_plan import IntervalPlan
+from partitioned_plan import PartitionCube, read_partitions
+from pipeline import write_partitioned
+from tests.test_demand_cube import synthetic_alloc
+from tests.test_plan_engine import TODAY
+
+QUERIES = [
+    {},
+    {'start': str(TODAY + timedelta(days=2)), 'end': str(TODAY + timedelta(days=20))},
+    {'end': str(TODAY + timedelta(days=6)), 'filters': {'Recruitment': ['Yes']}},
+    {'start': str(TODAY + timedelta(days=40)), 'filters': {'Gender': ['Female']}},
+]
+
+
+@pytest.mark.parametrize('countries', [['AR'], ['AR', 'CL']])
+def test_partition_cube_matches_global_cube(tmp_path, countries):
+    df_alloc = synthetic_alloc()
+    directory = str(tmp_path / 'plan_dataset')
+    write_partitioned(df_alloc, directory, today=TODAY, workers=1)
+    cube = DemandCube(IntervalPlan(df_alloc, TODAY, compact=True))
+    partition_cube = PartitionCube(read_partitions(directory, countries))
+
+    breakdowns = ['country', 'age_group', 'Gender', 'SEL', 'Region']
+    queries = [{**query, 'breakdowns': breakdowns, 'measure': measure} for query in QUERIES for measure in MEASURES]
+    expected = run_batch([{**query, 'filters': {**query.get('filters', {}), 'country': countries}} for query in queries],
+                         cube, FilterIndex(cube.cells, cube.dimensions))
+    actual = run_batch(queries, partition_cube, FilterIndex(partition_cube.cells, partition_cube.dimensions))
+    assert actual == expected
+    assert not hasattr(partition_cube, 'plan')
+
+
+def test_rewrite_swaps_dataset(tmp_path):
+    directory = str(tmp_path / 'plan_dataset')
+    first = write_partitioned(synthetic_alloc().iloc[:50], directory, today=TODAY, workers=1)
+    second = write_partitioned(synthetic_alloc(), directory, today=TODAY, workers=1)
+    assert second['rows'] > first['rows']
+    assert len(read_partitions(directory)) == second['rows']
+    assert sorted(os.listdir(tmp_path)) == ['plan_dataset']
@@ -0,0 +1,73 @@
+"""Cubo lido dos artefatos do precompute comparado ao cubo calculado na hora; artefatos obsoletos são ignorados."""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pipeline
+from benchmarks.synthetic import write_inputs
+from data_cache import read_table, write_arrow
+from demand_cube import MEASURES, DemandCube
+from lazy_plan import IntervalPlan
+from pipeline import load_cube, load_plan, precompute
+from plan_store import PlanStore
+from tests.test_demand_cube import synthetic_alloc
+
+TODAY = date.today()
+PERIODS = [(None, None), (TODAY, TODAY + timedelta(days=3)), (TODAY + timedelta(days=8), None)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_precomputed_cube_matches_fresh_cube(tmp_path, monkeypatch, workers):
+    monkeypatch.chdir(tmp_path)
+    synthetic_alloc().to_csv('alloc.csv', index=False)
+    directory = str(tmp_path / 'precomputed')
+    precompute('alloc.csv', directory, workers=workers)
+
+    df_alloc = read_table('alloc.csv')
+    plan = load_plan(df_alloc, directory, compact=True)
+    assert plan.precomputed_dir == directory
+    cube = load_cube(plan)
+    expected = DemandCube(IntervalPlan(df_alloc, compact=True))
+    assert cube.dimensions == expected.dimensions
+    for start, end in PERIODS:
+        assert cube.totals(start, end) == pytest.approx(expected.totals(start, end))
+        for col in cube.dimensions:
+            for measure in MEASURES:
+                breakdown = cube.breakdown(col, start, end, measure=measure)
+                reference = expected.breakdown(col, start, end, measure=measure)
+                assert list(map(str, breakdown.index)) == list(map(str, reference.index)), (col, measure)
+                np.testing.assert_allclose(breakdown.to_numpy(dtype='float64'),
+                                           reference.to_numpy(dtype='float64'))
+
+
+def test_other_artifact_version_rebuilds_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = write_inputs('inputs', 300, report_rows=50, seed=4)
+    precompute(paths['GeminiCheck.csv'], workers=1)
+    store_args = (paths['GeminiCheck.csv'], paths['Projects.csv'], paths['Report.xlsx'], ['country'])
+    assert PlanStore(*store_args).plan.precomputed_dir == pipeline.PRECOMPUTED_DIR
+
+    # Artefatos de outra versão do código: o store calcula plano e cubo na hora, sem ler os arquivos.
+    monkeypatch.setattr(pipeline, 'ARTIFACT_VERSION', pipeline.ARTIFACT_VERSION + 1)
+    monkeypatch.setattr(pipeline, 'read_arrow', None)
+    store = PlanStore(*store_args)
+    assert not hasattr(store.plan, 'precomputed_dir')
+    assert store.cube.totals() == pytest.approx(DemandCube(IntervalPlan(store.df_alloc, compact=True)).totals())
+
+
+def test_cube_tables_for_other_quotas_are_not_served(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    synthetic_alloc().to_csv('alloc.csv', index=False)
+    directory = str(tmp_path / 'precomputed')
+    precompute('alloc.csv', directory, workers=1)
+    write_arrow(pd.DataFrame({'cell': [0]}), os.path.join(directory, 'cube_quota_cell.arrow'))
+
+    df_alloc = read_table('alloc.csv')
+    plan = load_plan(df_alloc, directory, compact=True)
+    assert plan.precomputed_dir == directory
+    cube = load_cube(plan)
+    assert len(cube.quota_cell) == len(plan.quotas)
+    assert cube.totals() == pytest.approx(DemandCube(IntervalPlan(df_alloc, compact=True)).totals())
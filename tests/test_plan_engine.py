@@ -0,0 +1,133 @@
+"""build_plan() comparado à expansão original do dashboard (laço com itertuples)."""
+import ast
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_alloc
+from plan_engine import build_plan, compact_plan, memory_report
+
+TODAY = date(2025, 1, 6)
+
+
+def loop_plan(df_alloc, today):
+    # Versão original de generate_plan(), mantida como referência.
+    daily_plan = []
+    for row in df_alloc.itertuples():
+        total_recruits = getattr(row, 'Pessoas_Para_Recrutar', 0)
+        total_allocated = getattr(row, 'allocated_completes', 0)
+        days_to_deliver = getattr(row, 'DaystoDeliver', 1.0)
+        if pd.isna(days_to_deliver) or days_to_deliver < 1:
+            days_to_deliver = 1
+        days_to_deliver = int(days_to_deliver)
+        base_goal = total_recruits // days_to_deliver
+        remainder = total_recruits % days_to_deliver
+        base_allocated = total_allocated // days_to_deliver
+        remainder_allocated = total_allocated % days_to_deliver
+        for i in range(days_to_deliver):
+            plan_date = today + timedelta(days=i)
+            daily_goal = base_goal + 1 if i < remainder else base_goal
+            daily_allocated_goal = base_allocated + 1 if i < remainder_allocated else base_allocated
+            if daily_goal > 0 or daily_allocated_goal > 0:
+                new_row = row._asdict()
+                new_row.update({
+                    'plan_date': plan_date,
+                    'daily_recruitment_goal': daily_goal,
+                    'daily_allocated_goal': daily_allocated_goal,
+                    'original_quota_index': row.Index
+                })
+                del new_row['Index']
+                daily_plan.append(new_row)
+    if not daily_plan:
+        return pd.DataFrame()
+    df_daily_plan = pd.DataFrame(daily_plan)
+    df_daily_plan['plan_date'] = pd.to_datetime(df_daily_plan['plan_date']).dt.date
+
+    def extract_dynamic_data(row_series):
+        try:
+            keys = ast.literal_eval(row_series['cotas'])
+            values = ast.literal_eval(row_series['resultado_cota'])
+            if isinstance(keys, (list, tuple)) and len(keys) == len(values):
+                return dict(zip(keys, values))
+        except Exception:
+            return {}
+        return {}
+
+    dynamic_data = df_daily_plan.apply(extract_dynamic_data, axis=1)
+    dynamic_df = pd.DataFrame(dynamic_data.tolist(), index=df_daily_plan.index)
+    df_daily_plan_processed = pd.concat([df_daily_plan, dynamic_df], axis=1)
+    for col, replacement in {'Region': 'Any Region', 'SEL': 'Country without SEL'}.items():
+        if col in df_daily_plan_processed.columns:
+            df_daily_plan_processed[col] = df_daily_plan_processed[col].astype(str).replace('0', replacement)
+    df_daily_plan_processed['project_id'] = df_daily_plan_processed['project_id'].astype(str)
+    return df_daily_plan_processed
+
+
+def alloc_frame(**overrides):
+    df = pd.DataFrame({
+        'Unnamed: 0': [0, 1, 2, 3, 4, 5],
+        'project_id': [100045, 100027, 100045, 100031, 100027, 100031],
+        'country': ['CL', 'AR', 'CL', 'BR', 'AR', 'BR'],
+        'cotas': ["['Gender', 'Region', 'SEL', 'age_group']", "['Gender', 'Region', 'SEL']", "['age_group']",
+                  "['Gender'", "['Gender', 'SEL']", "['Gender']"],
+        'resultado_cota': ["['Male', 'Norte', 0, '35to44']", "['Male', 'Sul', 0]", "['18to24']",
+                           "['Female']", "['Female', 'A']", "['Male', 'B']"],
+        'Pessoas_Para_Recrutar': [291, 218, 7, 40, 0, 13],
+        'allocated_completes': [36, 42, 3, 9, 0, 2],
+        'DaystoDeliver': [10.7, 0.5, np.nan, 4.0, 3.0, -2.0],
+    })
+    return df.assign(**overrides)
+
+
+def assert_same_plan(df_alloc):
+    expected = loop_plan(df_alloc, TODAY)
+    pd.testing.assert_frame_equal(build_plan(df_alloc, TODAY), expected)
+
+
+def test_matches_loop():
+    assert_same_plan(alloc_frame())
+
+
+def test_fractional_and_invalid_days():
+    assert_same_plan(alloc_frame(DaystoDeliver=[2.9, 1.0, 0.99, np.nan, 7.5, 0.0]))
+
+
+def test_nan_totals():
+    assert_same_plan(alloc_frame(Pessoas_Para_Recrutar=[291.0, np.nan, 7.0, 40.0, np.nan, 13.0],
+                                 allocated_completes=[36.0, 42.0, np.nan, 9.0, 0.0, 2.0]))
+
+
+def test_malformed_quota_definitions():
+    assert_same_plan(alloc_frame(cotas=['not a list', "['Gender']", None, "['Gender'", "['Gender', 'SEL']", "[1, 2"]))
+
+
+def test_empty_plan():
+    assert build_plan(alloc_frame(Pessoas_Para_Recrutar=0, allocated_completes=0), TODAY).empty
+
+
+def test_compact_plan_keeps_values():
+    df_plan = build_plan(generate_alloc(300, seed=5), TODAY)
+    compact = compact_plan(df_plan)
+    assert list(compact.columns) == list(df_plan.columns)
+    pd.testing.assert_index_equal(compact.index, df_plan.index)
+    for col in ['project_id', 'Region', 'SEL']:
+        assert isinstance(compact[col].dtype, pd.CategoricalDtype), col
+    for col in ['daily_recruitment_goal', 'daily_allocated_goal', 'original_quota_index']:
+        assert pd.api.types.is_integer_dtype(compact[col]), col
+        assert compact[col].dtype.itemsize < df_plan[col].dtype.itemsize, col
+    assert compact['plan_date'].dtype == 'datetime64[s]'
+
+    restored = compact.astype({col: df_plan[col].dtype for col in df_plan.columns if col != 'plan_date'})
+    restored['plan_date'] = restored['plan_date'].dt.date
+    pd.testing.assert_frame_equal(restored, df_plan)
+
+
+def test_memory_report_totals_and_ratio():
+    df_plan = build_plan(generate_alloc(300, seed=5), TODAY)
+    report = memory_report(compact_plan(df_plan), baseline=df_plan)
+    assert report.index[-1] == '(total)'
+    total = report.loc['(total)']
+    assert total['bytes'] == report['bytes'].iloc[:-1].sum()
+    assert total['bytes_before'] == df_plan.memory_usage(deep=True, index=False).sum()
+    assert total['ratio'] == round(total['bytes_before'] / total['bytes'], 1) > 1
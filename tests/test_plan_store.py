@@ -0,0 +1,84 @@
+"""StoreWatcher: espera os arquivos assentarem, não repete uma carga que falhou e publica novas versões."""
+import time
+
+import pytest
+
+import plan_store
+from benchmarks.synthetic import generate_alloc, write_inputs
+from plan_store import StoreWatcher, replace_watcher
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = write_inputs('inputs', 100, report_rows=20, seed=1)
+    return paths['GeminiCheck.csv'], paths['Projects.csv'], paths['Report.xlsx'], ['country']
+
+
+def rewrite_alloc(path, seed):
+    generate_alloc(100 + seed, seed=seed).to_csv(path)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tempo esgotado"
+        time.sleep(0.02)
+
+
+def test_watcher_publishes_new_version(inputs):
+    watcher = StoreWatcher(*inputs, poll_seconds=0.05)
+    try:
+        assert watcher.snapshot.version == 1 and watcher.error is None
+        first = watcher.snapshot
+        rewrite_alloc(inputs[0], seed=2)
+        wait_for(lambda: watcher.snapshot.version == 2)
+        assert watcher.error is None
+        assert len(watcher.snapshot.df_alloc) == 102 and len(first.df_alloc) == 100
+    finally:
+        watcher.stop()
+
+
+def test_watcher_waits_for_files_to_settle_and_skips_failed_state(inputs, monkeypatch):
+    # Sem thread ativa na prática: as verificações são feitas à mão com _poll().
+    watcher = StoreWatcher(*inputs, poll_seconds=3600)
+    builds = []
+    store_class = plan_store.PlanStore
+
+    def counting_store(*args, **kwargs):
+        builds.append(kwargs['version'])
+        return store_class(*args, **kwargs)
+    monkeypatch.setattr(plan_store, 'PlanStore', counting_store)
+    try:
+        previous = watcher._poll(None)
+        with open(inputs[0], 'w') as f:
+            f.write('')
+        previous = watcher._poll(previous)
+        assert builds == []
+        previous = watcher._poll(previous)
+        assert builds == [2]
+        assert watcher.snapshot.version == 1 and watcher.error.startswith("Falha ao recarregar")
+
+        # Os mesmos arquivos quebrados não são carregados de novo.
+        previous = watcher._poll(watcher._poll(previous))
+        assert builds == [2]
+
+        rewrite_alloc(inputs[0], seed=3)
+        previous = watcher._poll(previous)
+        assert builds == [2]
+        watcher._poll(previous)
+        assert builds == [2, 2]
+        assert watcher.snapshot.version == 2 and watcher.error is None
+    finally:
+        watcher.stop()
+
+
+def test_replace_watcher_stops_previous(inputs):
+    first = replace_watcher(*inputs, poll_seconds=0.05)
+    second = replace_watcher(*inputs, poll_seconds=0.05)
+    try:
+        first._thread.join(timeout=5)
+        assert not first._thread.is_alive()
+        assert second._thread.is_alive()
+    finally:
+        second.stop()
@@ -0,0 +1,41 @@
+"""Índice do relatório atualizado aos poucos comparado ao embed() de todas as linhas."""
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_report
+from report_search import ReportIndex, document_texts, embed, update_index
+
+
+def report_frame():
+    df_report = generate_report(60, seed=3)
+    df_report.loc[4, 'Region'] = np.nan
+    df_report.loc[9, 'Expected Date'] = pd.NaT
+    # Duas linhas com o mesmo documento.
+    df_report.loc[20] = df_report.loc[21]
+    return df_report
+
+
+def test_missing_values_are_empty_text():
+    texts = document_texts(report_frame())
+    assert 'Region: \n' in texts[4] and 'nan' not in texts[4].lower()
+    assert texts[9].startswith('country: ') and 'Expected Date: \n' in texts[9] and 'NaT' not in texts[9]
+
+
+def test_update_reuses_unchanged_rows(tmp_path):
+    df_report = report_frame()
+    directory = str(tmp_path / 'index')
+    index, stats = update_index(df_report, directory)
+    assert stats == {'reused': 0, 'embedded': len(df_report), 'dropped': 0}
+
+    changed = df_report.copy()
+    changed.loc[7, 'people_to_recruit'] += 1000
+    changed = changed.drop(index=12)
+    changed = pd.concat([changed, df_report.iloc[[30]].assign(Gender='Other')], ignore_index=True)
+    index, stats = update_index(changed, directory)
+    assert stats == {'reused': len(changed) - 2, 'embedded': 2, 'dropped': 2}
+    np.testing.assert_allclose(index.vectors, embed(document_texts(changed).tolist()), atol=1e-6)
+    np.testing.assert_array_equal(index.row_ids, np.arange(len(changed)))
+
+    index, stats = update_index(changed, directory)
+    assert stats == {'reused': len(changed), 'embedded': 0, 'dropped': 0}
+    assert len(ReportIndex(directory)) == len(changed)
@@ -0,0 +1,57 @@
+"""Séries dos cenários comparadas às somas diárias por país do build_plan() da alocação alterada."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_alloc
+from lazy_plan import IntervalPlan
+from plan_engine import build_plan, delivery_days
+from scenarios import evaluate_scenario, scenario_table
+from tests.test_plan_engine import TODAY
+
+
+def plan_series(df_alloc, countries, horizon):
+    # Meta diária por país e dia (0 = TODAY) somada sobre as linhas do build_plan().
+    df_plan = build_plan(df_alloc, TODAY)
+    day = (pd.to_datetime(df_plan['plan_date']) - pd.Timestamp(TODAY)).dt.days.to_numpy()
+    country = pd.Index(countries).get_indexer(df_plan['country'])
+    series = {}
+    for col in ['daily_recruitment_goal', 'daily_allocated_goal']:
+        series[col] = np.zeros((len(countries), horizon), dtype=np.int64)
+        np.add.at(series[col], (country, day), df_plan[col].to_numpy().astype(np.int64))
+    return series
+
+
+def assert_matches_plan(result, table, df_alloc):
+    expected = plan_series(df_alloc, table['countries'], result['last_day'] + 1)
+    for col, series in result['series'].items():
+        np.testing.assert_array_equal(series, expected[col], err_msg=col)
+
+
+@pytest.fixture(scope='module')
+def df_alloc():
+    return generate_alloc(300, seed=11)
+
+
+def test_base_matches_plan(df_alloc):
+    table = scenario_table(IntervalPlan(df_alloc, TODAY))
+    assert_matches_plan(evaluate_scenario(table, {}), table, df_alloc)
+
+
+@pytest.mark.parametrize('delay', [7, -7])
+def test_delay_matches_plan(df_alloc, delay):
+    table = scenario_table(IntervalPlan(df_alloc, TODAY))
+    delayed = df_alloc.assign(DaystoDeliver=np.maximum(delivery_days(df_alloc) + delay, 1))
+    assert_matches_plan(evaluate_scenario(table, {'delay_days': delay}), table, delayed)
+
+
+def test_project_keys_as_numbers(df_alloc):
+    table = scenario_table(IntervalPlan(df_alloc, TODAY))
+    project = df_alloc['project_id'].iloc[0]
+    by_text = evaluate_scenario(table, {'days_to_deliver': {str(project): 10}, 'start_offset': {str(project): 3}})
+    by_number = evaluate_scenario(table, {'days_to_deliver': {int(project): 10}, 'start_offset': {int(project): 3}})
+    for col, series in by_text['series'].items():
+        np.testing.assert_array_equal(by_number['series'][col], series)
+
+    replaced = df_alloc.assign(DaystoDeliver=df_alloc['DaystoDeliver'].where(df_alloc['project_id'] != project, 10))
+    assert_matches_plan(evaluate_scenario(table, {'days_to_deliver': {int(project): 10}}), table, replaced)